@@ -2,25 +2,29 @@
 
 from datetime import datetime, timedelta
 import random
+from typing import List
 from uuid import uuid4
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import BackgroundTasks, HTTPException, Header, status
 from app.core.email import send_email
+from app.core.hashing import password_hasher
 from app.core.oauth2 import create_access_token_oauth2
 from app.database.models import OTP, OAuth2Client, User, UserLog, UserOAuth2
-from app.core.security import create_access_token, create_refresh_token, get_user_from_refresh_token, verify_password, get_password_hash
+from app.core.security import create_access_token, create_refresh_token, get_user_from_refresh_token, verify_and_update_password, verify_password, get_password_hash
 from app.database.models.blacklisted_token import BlacklistedToken
+from app.database.records import UserRecord, fetch_user, fetch_users
 from app.schemas.auth import OAuth2ClientCreateRequest, RefreshTokenRequest, RegisterRequest, LoginRequest, OTPRequest, OTPResendRequest, OTPVerifyRequest, TokenResponse
 
 OTP_EXPIRE_MINUTES = 1
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-def request_token_controller(client_id: str, client_secret: str, db: Session) -> str:
+async def request_token_controller(client_id: str, client_secret: str, db: AsyncSession) -> str:
     # Verify client credentials
-    client = db.query(OAuth2Client).filter(
+    client = await db.scalar(select(OAuth2Client).where(
         OAuth2Client.client_id == client_id,
         OAuth2Client.client_secret == client_secret
-    ).first()
+    ))
 
     if not client:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid client credentials")
@@ -30,9 +34,9 @@ def request_token_controller(client_id: str, client_secret: str, db: Session) ->
 
     return access_token
 
-def register_user_and_client(request: OAuth2ClientCreateRequest, db: Session) -> dict:
+async def register_user_and_client(request: OAuth2ClientCreateRequest, db: AsyncSession) -> dict:
     # Register the user
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await password_hasher.run(get_password_hash, request.password)
     db_user = UserOAuth2(
         username=request.username,
         hashed_password=hashed_password
@@ -41,11 +45,11 @@ def register_user_and_client(request: OAuth2ClientCreateRequest, db: Session) ->
     
     # Register the OAuth2 client
     client_id = request.client_id
-    client_secret = get_password_hash(request.client_secret)
+    client_secret = await password_hasher.run(get_password_hash, request.client_secret)
     redirect_uris = ','.join(request.redirect_uris) if request.redirect_uris else ''
 
     # Check if client ID already exists
-    existing_client = db.query(OAuth2Client).filter(OAuth2Client.client_id == client_id).first()
+    existing_client = await db.scalar(select(OAuth2Client).where(OAuth2Client.client_id == client_id))
     if existing_client:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Client ID already exists")
     
@@ -53,7 +57,7 @@ def register_user_and_client(request: OAuth2ClientCreateRequest, db: Session) ->
     db.add(new_client)
     
     # Commit the transaction for both
-    db.commit()
+    await db.commit()
     
     return {
         "message": "User and OAuth2 Client created successfully",
@@ -65,9 +69,9 @@ def register_user_and_client(request: OAuth2ClientCreateRequest, db: Session) ->
         }
     }
 
-def refresh_token(request: RefreshTokenRequest, db: Session) -> TokenResponse:
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession) -> TokenResponse:
     # Retrieve the user based on the refresh token
-    user = get_user_from_refresh_token(request.refresh_token, db)
+    user = await get_user_from_refresh_token(request.refresh_token, db)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
@@ -87,32 +91,32 @@ def validate_token(authorization: str = Header(None)):
     # Implement your token validation logic here (e.g., decode and verify token)
     return True
 
-def get_all_users(db: Session, authorization: str = Header(None)):
+async def get_all_users(db: AsyncSession, authorization: str = Header(None)) -> List[UserRecord]:
     validate_token(authorization)
-    return db.query(User).all()
+    return await fetch_users(db)
 
-def get_user_by_id(user_id: int, db: Session, authorization: str = Header(None)):
+async def get_user_by_id(user_id: int, db: AsyncSession, authorization: str = Header(None)) -> UserRecord:
     validate_token(authorization)
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await fetch_user(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
-def get_current_user_by_token(token: str, db: Session) -> User:
+async def get_current_user_by_token(token: str, db: AsyncSession) -> User:
     user_email = validate_token(token)  # Ensure token validation returns user info
-    user = db.query(User).filter(User.email == user_email).first()
+    user = await db.scalar(select(User).where(User.email == user_email))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
-def register_user(request: RegisterRequest, db: Session, background_tasks: BackgroundTasks):
+async def register_user(request: RegisterRequest, db: AsyncSession, background_tasks: BackgroundTasks):
     if request.password != request.password_confirmation:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Passwords do not match")
 
-    if db.query(User).filter(User.email == request.email).first():
+    if await db.scalar(select(User).where(User.email == request.email)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await password_hasher.run(get_password_hash, request.password)
 
     new_user = User(
         full_name=request.full_name,
@@ -123,12 +127,12 @@ def register_user(request: RegisterRequest, db: Session, background_tasks: Backg
 
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
         user_log = UserLog(user_id=new_user.id, event="register")
         db.add(user_log)
-        db.commit()
+        await db.commit()
 
         # Immediately send OTP upon registration
         otp_code = random.randint(100000, 999999)
@@ -143,7 +147,7 @@ def register_user(request: RegisterRequest, db: Session, background_tasks: Backg
         )
         
         db.add(otp)
-        db.commit()
+        await db.commit()
 
         # Prepare the email content
         email_subject = "Email Verification Code"
@@ -177,18 +181,23 @@ def register_user(request: RegisterRequest, db: Session, background_tasks: Backg
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Registration failed")
 
-def login_user(request: LoginRequest, db: Session):
-    user = db.query(User).filter(User.email == request.email).first()
-    
-    if not user or not verify_password(request.password, user.hashed_password):
+async def login_user(request: LoginRequest, db: AsyncSession):
+    user = await db.scalar(select(User).where(User.email == request.email))
+    valid, new_hash = await password_hasher.run(verify_and_update_password, request.password, user.hashed_password) if user else (False, None)
+
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User account not activated. Please verify your email with OTP.")
 
+    # The stored hash predates the current scheme or cost; it is replaced with the commit below
+    if new_hash:
+        user.hashed_password = new_hash
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token_expires = timedelta(days=7)  # Refresh token expiry
 
@@ -203,7 +212,7 @@ def login_user(request: LoginRequest, db: Session):
     )
 
     user.refresh_token = refresh_token
-    db.commit()
+    await db.commit()
 
     return {
         "message": "Login successful",
@@ -218,8 +227,8 @@ def login_user(request: LoginRequest, db: Session):
         }
     }
 
-def request_otp(request, db: Session, background_tasks: BackgroundTasks):
-    user = db.query(User).filter(User.email == request.email).first()
+async def request_otp(request, db: AsyncSession, background_tasks: BackgroundTasks):
+    user = await db.scalar(select(User).where(User.email == request.email))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
@@ -239,7 +248,7 @@ def request_otp(request, db: Session, background_tasks: BackgroundTasks):
 
     try:
         db.add(otp)
-        db.commit()
+        await db.commit()
 
         # Prepare email content
         email_subject = "Your OTP Code for Email Verification"
@@ -266,11 +275,11 @@ def request_otp(request, db: Session, background_tasks: BackgroundTasks):
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="OTP request failed")
     
-def verify_otp(request: OTPVerifyRequest, db: Session):
-    otp = db.query(OTP).filter(OTP.email == request.email, OTP.otp_code == request.otp_code, OTP.active == True).first()
+async def verify_otp(request: OTPVerifyRequest, db: AsyncSession):
+    otp = await db.scalar(select(OTP).where(OTP.email == request.email, OTP.otp_code == request.otp_code, OTP.active == True))
     if not otp:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired OTP.")
     
@@ -278,25 +287,25 @@ def verify_otp(request: OTPVerifyRequest, db: Session):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="OTP has expired.")
 
     otp.active = False
-    db.commit()
+    await db.commit()
 
-    user = db.query(User).filter(User.email == request.email).first()
+    user = await db.scalar(select(User).where(User.email == request.email))
     user.is_active = True
-    db.commit()
+    await db.commit()
 
     return {
         "message": "OTP verified successfully. You can now log in."
     }
 
-def resend_otp(request, db: Session, background_tasks: BackgroundTasks):
-    user = db.query(User).filter(User.email == request.email).first()
+async def resend_otp(request, db: AsyncSession, background_tasks: BackgroundTasks):
+    user = await db.scalar(select(User).where(User.email == request.email))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
 
     if user.is_active:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already verified.")
     
-    existing_otp = db.query(OTP).filter(OTP.email == request.email, OTP.active == True).first()
+    existing_otp = await db.scalar(select(OTP).where(OTP.email == request.email, OTP.active == True))
     if existing_otp and existing_otp.expires_at > datetime.utcnow():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="An active OTP already exists.")
     
@@ -313,7 +322,7 @@ def resend_otp(request, db: Session, background_tasks: BackgroundTasks):
 
     try:
         db.add(new_otp)
-        db.commit()
+        await db.commit()
 
         # Prepare email content
         email_subject = "Resend OTP Code"
@@ -340,34 +349,34 @@ def resend_otp(request, db: Session, background_tasks: BackgroundTasks):
             }
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="OTP resend failed")
     
-def logout_user(token: str, db: Session):
-    user = db.query(User).filter(User.refresh_token == token).first()
+async def logout_user(token: str, db: AsyncSession):
+    user = await db.scalar(select(User).where(User.refresh_token == token))
     if user:
         user.refresh_token = None
-        db.commit()
+        await db.commit()
 
     blacklisted_token = BlacklistedToken(token=token)
     db.add(blacklisted_token)
-    db.commit()
+    await db.commit()
     return {"message": "Logged out successfully"}
 
-def change_user_email(new_email: str, password: str, current_user: User, db: Session) -> dict:
-    if db.query(User).filter(User.email == new_email).first():
+async def change_user_email(new_email: str, password: str, current_user: User, db: AsyncSession) -> dict:
+    if await db.scalar(select(User).where(User.email == new_email)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use")
     
-    user = db.query(User).filter(User.id == current_user.id).first()
-    if not verify_password(password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.id == current_user.id))
+    if not await password_hasher.run(verify_password, password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     
     user.email = new_email
-    db.commit()
+    await db.commit()
     return {"message": "Email changed successfully"}
 
-def forgot_password_controller(email: str, db: Session, background_tasks: BackgroundTasks):
-    user = db.query(User).filter(User.email == email).first()
+async def forgot_password_controller(email: str, db: AsyncSession, background_tasks: BackgroundTasks):
+    user = await db.scalar(select(User).where(User.email == email))
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User with this email does not exist")
@@ -387,7 +396,7 @@ def forgot_password_controller(email: str, db: Session, background_tasks: Backgr
         active=True
     )
     db.add(otp)
-    db.commit()
+    await db.commit()
 
     # Prepare email content
     email_subject = "Password Reset Request"
@@ -418,7 +427,7 @@ def forgot_password_controller(email: str, db: Session, background_tasks: Backgr
         }
     }
 
-def reset_password_controller(password: str, password_confirmation: str, password_token: str, db: Session):
+async def reset_password_controller(password: str, password_confirmation: str, password_token: str, db: AsyncSession):
     # Check if passwords match
     if password != password_confirmation:
         raise HTTPException(
@@ -427,7 +436,7 @@ def reset_password_controller(password: str, password_confirmation: str, passwor
         )
 
     # Look up the reset token in OTP table
-    token_entry = db.query(OTP).filter(OTP.otp_code == password_token, OTP.active == True).first()
+    token_entry = await db.scalar(select(OTP).where(OTP.otp_code == password_token, OTP.active == True))
 
     if not token_entry or token_entry.expires_at < datetime.utcnow():
         raise HTTPException(
@@ -436,7 +445,7 @@ def reset_password_controller(password: str, password_confirmation: str, passwor
         )
 
     # Look up the user based on email
-    user = db.query(User).filter(User.email == token_entry.email).first()
+    user = await db.scalar(select(User).where(User.email == token_entry.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -444,13 +453,13 @@ def reset_password_controller(password: str, password_confirmation: str, passwor
         )
 
     # Hash the new password
-    user.hashed_password = get_password_hash(password)
+    user.hashed_password = await password_hasher.run(get_password_hash, password)
 
     # Deactivate the token (so it can't be reused)
     token_entry.active = False
 
     # Save changes to the database
-    db.commit()
+    await db.commit()
 
     return {"message": "Password reset successfully."}
 
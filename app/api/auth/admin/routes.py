@@ -3,9 +3,11 @@
 from datetime import timedelta
 from typing import List
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException,Header, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.hashing import password_hasher
+from app.core.responses import FastJSONResponse, fast_json
 from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user
-from app.database.config import get_db
+from app.database.config import get_async_db
 from app.database.models import User
 
 from app.schemas.auth import ( ChangeEmailRequest, ForgetPasswordRequest, OAuth2ClientCreateRequest,
@@ -18,67 +20,71 @@ request_token_controller, reset_password_controller, verify_otp,resend_otp )
 
 from app.security.jwt import validate_token
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 @router.get("/token")
-def request_token(client_id: str, client_secret: str, db: Session = Depends(get_db)):
+async def request_token(client_id: str, client_secret: str, db: AsyncSession = Depends(get_async_db)):
     try:
-        access_token = request_token_controller(client_id, client_secret, db)
+        access_token = await request_token_controller(client_id, client_secret, db)
         return {"access_token": access_token, "token_type": "bearer"}
     except HTTPException as e:
         raise e
 
 @router.post("/register/oauth2")
-def register_user_and_client_endpoint(request: OAuth2ClientCreateRequest, db: Session = Depends(get_db)):
-    return register_user_and_client(request, db)
+async def register_user_and_client_endpoint(request: OAuth2ClientCreateRequest, db: AsyncSession = Depends(get_async_db)):
+    return await register_user_and_client(request, db)
 
 @router.post("/token/refresh", response_model=TokenResponse)
-async def refresh_token_endpoint(request: RefreshTokenRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    return refresh_token(request, db)
+async def refresh_token_endpoint(request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)) -> TokenResponse:
+    return await refresh_token(request, db)
 
 @router.get("/current-user", response_model=UserResponse)
 async def get_current_user_route(
     current_user: User = Depends(get_current_user),  
-    db: Session = Depends(get_db)
-):  return current_user
+    db: AsyncSession = Depends(get_async_db)
+):  return fast_json(UserResponse.from_orm(current_user))
     
 
+@router.get("/hashing/stats")
+async def get_hashing_stats_route(current_user: User = Depends(get_current_user)):
+    return password_hasher.stats()
+
 @router.get("/users", response_model=List[UserResponse])
-def get_users_route(
+async def get_users_route(
     current_user: User = Depends(get_current_user),  
-    db: Session = Depends(get_db)
-):  return get_all_users(db)
+    db: AsyncSession = Depends(get_async_db)
+):  return fast_json([user._asdict() for user in await get_all_users(db)])
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-def get_user_route(
+async def get_user_route(
     user_id: int,
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
-):  return get_user_by_id(user_id, db)
+    db: AsyncSession = Depends(get_async_db)
+):  return fast_json((await get_user_by_id(user_id, db))._asdict())
 
 @router.post("/register", response_model=RegisterResponse)
-def register(request: RegisterRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    return register_user(request, db, background_tasks)
+async def register(request: RegisterRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    return await register_user(request, db, background_tasks)
 
 @router.post("/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    return login_user(request, db)
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    return await login_user(request, db)
 
 @router.post("/request-otp")
-def request_otp_endpoint(request: OTPRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    return request_otp(request, db, background_tasks)
+async def request_otp_endpoint(request: OTPRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    return await request_otp(request, db, background_tasks)
 
 @router.post("/verify-otp")
-def otp_verify(request: OTPVerifyRequest, db: Session = Depends(get_db)):
-    return verify_otp(request, db)
+async def otp_verify(request: OTPVerifyRequest, db: AsyncSession = Depends(get_async_db)):
+    return await verify_otp(request, db)
 
 @router.post("/resend-otp")
-def otp_resend(request: OTPResendRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    return request_otp(request, db, background_tasks)
+async def otp_resend(request: OTPResendRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    return await request_otp(request, db, background_tasks)
 
 @router.post("/logout")
-def logout(authorization: str = Header(None), db: Session = Depends(get_db)):
-    token = validate_token(authorization, db) 
+async def logout(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)):
+    token = await validate_token(authorization, db) 
     # Implement the logout logic here
     return {"message": "Logged out successfully"}
 
@@ -86,17 +92,17 @@ def logout(authorization: str = Header(None), db: Session = Depends(get_db)):
 async def change_email(
     request: ChangeEmailRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-): return change_user_email(request.new_email, request.password, current_user, db)
+    db: AsyncSession = Depends(get_async_db)
+): return await change_user_email(request.new_email, request.password, current_user, db)
 
 @router.post("/forgot-password")
-def forgot_password(
+async def forgot_password(
     request: ForgetPasswordRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-): return forgot_password_controller(request.email, db, background_tasks)
+    db: AsyncSession = Depends(get_async_db)
+): return await forgot_password_controller(request.email, db, background_tasks)
 
 @router.post("/reset-password")
-def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db)):
-    return reset_password_controller(request.password, request.password_confirmation, request.password_token, db)
+async def reset_password(request: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)):
+    return await reset_password_controller(request.password, request.password_confirmation, request.password_token, db)
 
@@ -0,0 +1,76 @@
+# app/api/fake/controllers.py
+
+from typing import Iterator, List
+from app.core.fake_data import (
+    FakeDataConfig, fake_order, fake_product, fake_user, np, order_block, product_block, user_block,
+)
+from app.core.responses import json_dumps
+
+FAKE_RESOURCES = ("products", "users", "orders")
+# Records generated and written per chunk of the stream
+FAKE_BLOCK_SIZE = 2000
+
+
+def _product(k: int, row: dict) -> dict:
+    # Database columns to the ProductBase shape
+    rate, count = row.pop("rating_rate"), row.pop("rating_count")
+    return {
+        "id": k + 1,
+        "title": row["title"],
+        "price": row["price"],
+        "description": row["description"],
+        "brand": row["brand"],
+        "model": row["model"],
+        "color": row["color"],
+        "category": row["category"],
+        "image_ref": None,
+        "discountPercentage": row["discountPercentage"],
+        "stockQuantity": row["stockQuantity"],
+        "rating": {"rate": rate, "count": count},
+        "availabilityStatus": row["availabilityStatus"],
+    }
+
+
+def _user(k: int, row: dict) -> dict:
+    # The UserResponse shape; fake users have no password
+    return {"id": k + 1, "full_name": row["full_name"], "email": row["email"], "role": row["role"], "is_active": row["is_active"]}
+
+
+def fake_records(resource: str, seed: int, start: int, stop: int, products: int, users: int) -> List[dict]:
+    """Records start <= k < stop of a resource, in API shape.
+
+    Record k depends only on (seed, k), so any range can be generated on its
+    own and a client continues a stream by asking again from the next k. Whole
+    ranges are generated with numpy when it is installed, record by record
+    otherwise; both give the same records.
+    """
+    config = FakeDataConfig()
+    ks = range(start, stop)
+    if resource == "products":
+        rows = product_block(seed, start, stop, config) if np is not None else [fake_product(seed, k, config) for k in ks]
+        return [_product(k, row) for k, row in zip(ks, rows)]
+    if resource == "users":
+        rows = user_block(seed, start, stop, "") if np is not None else [fake_user(seed, k, "") for k in ks]
+        return [_user(k, row) for k, row in zip(ks, rows)]
+    if np is not None:
+        return order_block(seed, start, stop, products, users, config)
+    return [fake_order(seed, k, products, users, config) for k in ks]
+
+
+def stream_fake(resource: str, seed: int, start: int, count: int, ndjson: bool,
+                products: int, users: int, block_size: int = FAKE_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield `count` records from `start` as a JSON array or NDJSON, one chunk per block.
+
+    Nothing is generated ahead of the chunk being written, so memory stays flat
+    however many records are asked for.
+    """
+    if not ndjson:
+        yield b"["
+    for block_start in range(start, start + count, block_size):
+        records = fake_records(resource, seed, block_start, min(block_start + block_size, start + count), products, users)
+        if ndjson:
+            yield b"".join(json_dumps(record) + b"\n" for record in records)
+        else:
+            yield (b"," if block_start > start else b"") + b",".join(json_dumps(record) for record in records)
+    if not ndjson:
+        yield b"]"
@@ -0,0 +1,38 @@
+# app/api/fake/routes.py
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.api.fake.controllers import FAKE_RESOURCES, stream_fake
+from app.core.responses import NDJSON_MEDIA_TYPE
+
+fake = APIRouter()
+
+MAX_FAKE_COUNT = 1000000
+
+
+@fake.get("/{resource}")
+def get_fake_records_route(
+    resource: str,
+    request: Request,
+    seed: int = Query(42, ge=0),
+    count: int = Query(100, ge=0, le=MAX_FAKE_COUNT),
+    start: int = Query(0, ge=0),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    products: int = Query(1000, ge=1, description="Products that orders reference"),
+    users: int = Query(1000, ge=1, description="Users that orders belong to"),
+):
+    """Seeded mock records generated on the fly; the database is never read.
+
+    The same seed always gives the same records, and X-Next-Start is the
+    `start` that continues this response.
+    """
+    if resource not in FAKE_RESOURCES:
+        raise HTTPException(status_code=404, detail=f"Unknown resource. Available: {', '.join(FAKE_RESOURCES)}")
+
+    ndjson = format == "ndjson" or (format is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", ""))
+    return StreamingResponse(
+        stream_fake(resource, seed, start, count, ndjson, products, users),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else "application/json",
+        headers={"X-Next-Start": str(start + count), "Vary": "Accept"},
+    )
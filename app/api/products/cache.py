@@ -0,0 +1,70 @@
+# app/api/products/cache.py
+
+import json
+import os
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional
+from dotenv import load_dotenv
+from app.core.cache import ResponseCache
+
+load_dotenv("env/.env")
+
+# Serialized product responses. Set PRODUCT_CACHE_MAX_ENTRIES=0 to disable.
+product_cache = ResponseCache(
+    max_entries=int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", 10000)),
+    max_bytes=int(os.getenv("PRODUCT_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    ttl=float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", 60)),
+)
+
+CATEGORIES_KEY = ("categories",)
+
+
+class CachedBody(NamedTuple):
+    """A serialized response and the state it was read at.
+
+    Validators are derived from the entry, never from a fresh database read,
+    so a hit costs no round trip and the ETag always describes the body that
+    is sent. Writes from other processes show up once the entry expires.
+    """
+    body: bytes
+    version: Optional[int]  # The product's version, or the catalog generation for listings
+    updated_at: Optional[datetime]
+
+
+def cache_body(key: tuple, cached: CachedBody):
+    product_cache.set(key, cached, size=len(cached.body))
+
+
+def product_key(product_id: int) -> tuple:
+    # Holds the product's own JSON, not a whole envelope, so other responses can reuse it
+    return ("product", product_id)
+
+
+def category_key(category: str, cursor: Optional[str], page_size: int, fields: Optional[List[str]] = None) -> tuple:
+    return ("category", category, cursor, page_size, tuple(fields) if fields else None)
+
+
+def success_envelope(message: str, data: bytes, **extra) -> bytes:
+    # Splices already-serialized data into the usual status/message/data envelope
+    body = b'{"status":"success","message":' + json.dumps(message).encode() + b',"data":' + data
+    for name, value in extra.items():
+        body += b',' + json.dumps(name).encode() + b':' + json.dumps(value).encode()
+    return body + b'}'
+
+
+def invalidate_product(product_id: Optional[int], categories: Optional[Iterable[Optional[str]]]):
+    """Drop every cached response a write to this product can change.
+
+    `categories` should include both the old and the new category when a
+    product moves, so that both listings are refreshed. Pass None when the old
+    category is unknown to drop every category listing.
+    """
+    if product_id is not None:
+        product_cache.invalidate(product_key(product_id))
+    product_cache.invalidate(CATEGORIES_KEY)
+    product_cache.invalidate_prefix(("stats",))
+    if categories is None:
+        product_cache.invalidate_prefix(("category",))
+        return
+    for category in set(categories):
+        product_cache.invalidate_prefix(("category", category))
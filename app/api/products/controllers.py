@@ -1,33 +1,75 @@
 # app/api/products/controllers.py
 
-from sqlalchemy import distinct
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional
+from pydantic import ValidationError
+from sqlalchemy import case, func, select, update
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.schemas.product import CategoryResponse, ProductCreate, ProductResponse, ProductUpdate, ProductBase, ProductsResponse, SingleProductResponse
+from app.core.blob_store import blob_store, store_image
+from app.core.responses import json_dumps
+from app.database.category_stats import category_stats
+from app.database.config import AsyncSessionLocal
+from app.database.fts import build_match_query, products_fts
+from app.database.product_bulk import insert_products
+from app.database.product_changes import product_changes
+from app.helper.csv_helper import iter_csv_records
+from app.helper.json_helper import iter_ndjson_records
+from app.api.products.cache import CachedBody, cache_body, invalidate_product, product_cache, product_key
+from app.api.products.fields import product_columns, serialize_products
+from app.api.products.filters import facet_counts, filter_conditions
+from app.api.products.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.api.products.snapshot import paginate_snapshot, product_snapshot
+from app.api.products.stats import StatsQuery, snapshot_stats, sql_stats
+from app.api.products.sorting import parse_sort
+from app.schemas.product import BulkImportResponse, BulkImportResult, BulkRowError, CategoryResponse, ChangesResponse, CategoryStats, ProductCreate, ProductFilters, ProductQueryResponse, ProductResponse, ProductUpdate, Rating, ProductBase, ProductsResponse, SingleProductResponse, StatsResponse
 from app.database.models.products import Product
 from sqlalchemy.exc import NoResultFound
 
-def create_product(db: Session, product: ProductCreate) -> ProductResponse:
+STREAM_BATCH_SIZE = 1000
+BULK_BATCH_SIZE = 5000
+BULK_MAX_REPORTED_ERRORS = 1000
+MAX_BATCH_SIZE = 500
+
+
+def product_values(product: ProductCreate) -> dict:
+    """Column values for a new Product row. An inline image goes to the blob store."""
+    if product.image:
+        image_ref = store_image(product.image)
+    elif product.image_ref and not blob_store.exists(product.image_ref):
+        raise ValueError("Unknown image_ref")
+    else:
+        image_ref = product.image_ref
+
+    return dict(
+        title=product.title,
+        price=product.price,
+        description=product.description,
+        brand=product.brand,
+        model=product.model,
+        color=product.color,
+        category=product.category,
+        image_ref=image_ref,
+        discountPercentage=product.discountPercentage,
+        stockQuantity=product.stockQuantity,
+        rating_rate=product.rating.rate if product.rating else None,
+        rating_count=product.rating.count if product.rating else None,
+        availabilityStatus=product.availabilityStatus
+    )
+
+
+async def create_product(db: AsyncSession, product: ProductCreate) -> ProductResponse:
     try:
-        db_product = Product(
-            title=product.title,
-            price=product.price,
-            description=product.description,
-            brand=product.brand,
-            model=product.model,
-            color=product.color,
-            category=product.category,
-            image=product.image,
-            discountPercentage=product.discountPercentage,
-            stockQuantity=product.stockQuantity,
-            rating_rate=product.rating.rate if product.rating else None,
-            rating_count=product.rating.count if product.rating else None,
-            availabilityStatus=product.availabilityStatus
-        )
+        # Writing an inline image to the blob store is file IO, kept off the event loop
+        db_product = Product(**await run_in_threadpool(product_values, product))
         db.add(db_product)
-        db.commit()
-        db.refresh(db_product)
-        # Debug print
-        print(f"Created Product: {db_product}")
+        await db.flush()
+        delta = await product_snapshot.read_delta(db, [db_product.id], changes=1)
+        await db.commit()
+        product_snapshot.apply(delta)
+        await db.refresh(db_product)
+        invalidate_product(db_product.id, [db_product.category])
 
         return SingleProductResponse(
             status="success",
@@ -42,45 +84,207 @@ def create_product(db: Session, product: ProductCreate) -> ProductResponse:
         )
 
 
-def update_product(db: Session, product_id: int, product_update: ProductUpdate) -> ProductResponse:
+def _flat_rating(record: dict) -> dict:
+    # CSV has no nesting, so the rating arrives as rating_rate / rating_count columns
+    record = dict(record)
+    rate, count = record.pop("rating_rate", None), record.pop("rating_count", None)
+    if rate is not None or count is not None:
+        record["rating"] = {"rate": rate, "count": count}
+    return record
+
+
+def bulk_import_products(db: Session, stream: BinaryIO, fmt: str, batch_size: int = BULK_BATCH_SIZE) -> BulkImportResponse:
+    """Insert products from a CSV or NDJSON stream, one transaction per batch.
+
+    Invalid rows are skipped and reported; they never abort the upload. Each
+    batch is written with a single executemany INSERT, with the per-row
+    triggers suspended; see insert_products.
+    """
+    if fmt == "csv":
+        records = (
+            (row, _flat_rating(record) if record else record, error)
+            for row, record, error in iter_csv_records(stream)
+        )
+    elif fmt == "ndjson":
+        records = iter_ndjson_records(stream)
+    else:
+        return BulkImportResponse(status="error", message="Unsupported format. Use 'csv' or 'ndjson'.")
+
+    result = BulkImportResult(received=0, inserted=0, failed=0, errors=[])
+
+    def reject(row: int, messages):
+        result.failed += 1
+        if len(result.errors) < BULK_MAX_REPORTED_ERRORS:
+            result.errors.append(BulkRowError(row=row, errors=messages))
+
     try:
-        db_product = db.query(Product).filter(Product.id == product_id).first()
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+
+            mappings = []
+            for row, record, error in batch:
+                result.received += 1
+                if error:
+                    reject(row, [error])
+                    continue
+                try:
+                    mappings.append(product_values(ProductCreate(**record)))
+                except ValidationError as e:
+                    reject(row, [
+                        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                        for err in e.errors()
+                    ])
+                except ValueError as e:
+                    reject(row, [str(e)])
+
+            if mappings:
+                insert_products(db, mappings)
+                db.commit()
+                result.inserted += len(mappings)
+                invalidate_product(None, {mapping["category"] for mapping in mappings})
+    except Exception as e:
+        db.rollback()
+        return BulkImportResponse(
+            status="error",
+            message=f"Import stopped after {result.inserted} inserted rows: {e}",
+            data=result
+        )
+
+    return BulkImportResponse(
+        status="success",
+        message="Bulk import finished",
+        data=result
+    )
+
+
+def update_values(product_update: ProductUpdate) -> dict:
+    """Column values for the fields set in `product_update`, skipping nulls.
+
+    The nested rating maps onto rating_rate / rating_count and an inline image
+    goes to the blob store.
+    """
+    values = {}
+    for attr, value in vars(product_update).items():
+        if value is None:
+            continue
+        if attr == "image":
+            values["image_ref"] = store_image(value)
+        elif attr == "rating":
+            if value.rate is not None:
+                values["rating_rate"] = value.rate
+            if value.count is not None:
+                values["rating_count"] = value.count
+        else:
+            values[attr] = value
+    return values
+
+
+# Every column except the deferred legacy image
+_RETURNED_COLUMNS = [column for column in Product.__table__.columns if column.key != "image"]
+
+
+def product_from_row(row) -> ProductBase:
+    data = dict(row._mapping)
+    rate, count = data.pop("rating_rate", None), data.pop("rating_count", None)
+    if rate is not None or count is not None:
+        data["rating"] = Rating(rate=rate, count=count)
+    return ProductBase(**data)
+
+
+async def patch_product(db: AsyncSession, product_id: int, product_update: ProductUpdate) -> SingleProductResponse:
+    """Apply a partial update as one UPDATE ... RETURNING statement.
+
+    No row is loaded into the session and nothing is re-read after the
+    commit; the response is built from the returned row.
+    """
+    try:
+        values = await run_in_threadpool(update_values, product_update)
+        if not values:
+            return SingleProductResponse(
+                status="error",
+                message="No fields to update",
+                data=None
+            )
+
+        row = (await db.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(**values)
+            .returning(*_RETURNED_COLUMNS)
+        )).first()
+        if row is None:
+            await db.rollback()
+            return SingleProductResponse(
+                status="error",
+                message="Product not found",
+                data=None
+            )
+        delta = await product_snapshot.read_delta(db, [product_id], changes=1)
+        await db.commit()
+        product_snapshot.apply(delta)
+        # RETURNING only sees the new row, so a category move drops every listing
+        invalidate_product(product_id, None if "category" in values else [row.category])
+
+        return SingleProductResponse(
+            status="success",
+            message="Product updated successfully",
+            data=product_from_row(row)
+        )
+    except Exception as e:
+        await db.rollback()
+        return SingleProductResponse(
+            status="error",
+            message=str(e),
+            data=None
+        )
+
+
+async def update_product(db: AsyncSession, product_id: int, product_update: ProductUpdate) -> SingleProductResponse:
+    try:
+        db_product = await db.scalar(select(Product).where(Product.id == product_id))
         if db_product is None:
-            return ProductResponse(
+            return SingleProductResponse(
                 status="error",
                 message="Product not found",
                 data=None
             )
         
-        for attr, value in vars(product_update).items():
-            if value is not None:
-                setattr(db_product, attr, value)
+        old_category = db_product.category
+        for attr, value in (await run_in_threadpool(update_values, product_update)).items():
+            setattr(db_product, attr, value)
         
-        db.commit()
-        db.refresh(db_product)
+        changes = int(db.is_modified(db_product))
+        await db.flush()
+        delta = await product_snapshot.read_delta(db, [product_id], changes=changes)
+        await db.commit()
+        product_snapshot.apply(delta)
+        await db.refresh(db_product)
+        invalidate_product(product_id, [old_category, db_product.category])
         
-        return ProductResponse(
+        return SingleProductResponse(
             status="success",
             message="Product updated successfully",
             data=ProductBase.from_orm(db_product)
         )
     except NoResultFound:
-        return ProductResponse(
+        return SingleProductResponse(
             status="error",
             message="Product not found",
             data=None
         )
     except Exception as e:
-        return ProductResponse(
+        return SingleProductResponse(
             status="error",
             message=str(e),
             data=None
         )
 
 
-def delete_product(db: Session, product_id: int) -> ProductResponse:
+async def delete_product(db: AsyncSession, product_id: int) -> ProductResponse:
     try:
-        db_product = db.query(Product).filter(Product.id == product_id).first()
+        db_product = await db.scalar(select(Product).where(Product.id == product_id))
         if db_product is None:
             return ProductResponse(
                 status="error",
@@ -88,8 +292,12 @@ def delete_product(db: Session, product_id: int) -> ProductResponse:
                 data=None
             )
         
-        db.delete(db_product)
-        db.commit()
+        await db.delete(db_product)
+        await db.flush()
+        delta = await product_snapshot.read_delta(db, [product_id], changes=1)
+        await db.commit()
+        product_snapshot.apply(delta)
+        invalidate_product(product_id, [db_product.category])
         
         return ProductResponse(
             status="success",
@@ -110,15 +318,18 @@ def delete_product(db: Session, product_id: int) -> ProductResponse:
         )
     
 
-def get_all_products(db: Session) -> ProductsResponse:
+async def get_all_products(db: AsyncSession, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None) -> ProductsResponse:
     try:
-        products = db.query(Product).all()
-        product_list = [ProductBase.from_orm(product) for product in products]
+        keys = [("id", Product.id, False)]
+        stmt = select(*product_columns(fields))
+        rows, next_cursor = await paginate(db, stmt, keys, cursor, page_size, scalars=False)
+        product_list = serialize_products(rows, fields)
         
         return ProductsResponse(
             status="success",
             message="Products retrieved successfully",
-            data=product_list
+            data=product_list,
+            next_cursor=next_cursor
         )
     except Exception as e:
         return ProductsResponse(
@@ -128,38 +339,132 @@ def get_all_products(db: Session) -> ProductsResponse:
         )
     
 
-def get_product_by_id(db: Session, product_id: int) -> ProductResponse:
+async def stream_products(batch_size: int = STREAM_BATCH_SIZE, fields: Optional[List[str]] = None) -> AsyncIterator[bytes]:
+    """Yield the whole catalog as NDJSON, one chunk per batch of rows.
+
+    Rows come off the cursor `batch_size` at a time and each batch is written out
+    before the next is fetched, so memory stays flat regardless of catalog size.
+    The stream outlives the request's dependencies, so it owns its session.
+    """
+    async with AsyncSessionLocal() as db:
+        stmt = (
+            select(*product_columns(fields))
+            .order_by(Product.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream(stmt)
+        async for batch in result.partitions():
+            yield b"".join(json_dumps(item) + b"\n" for item in serialize_products(batch, fields))
+
+
+async def get_product_by_id(db: AsyncSession, product_id: int, fields: Optional[List[str]] = None) -> SingleProductResponse:
     try:
-        db_product = db.query(Product).filter(Product.id == product_id).first()
-        if db_product is None:
-            return ProductResponse(
+        row = (await db.execute(select(*product_columns(fields)).where(Product.id == product_id))).first()
+        if row is None:
+            return SingleProductResponse(
                 status="error",
                 message="Product not found",
                 data=None
             )
-        product_data = ProductBase.from_orm(db_product)
-        return ProductResponse(
+        product_data = serialize_products([row], fields)[0]
+        return SingleProductResponse(
             status="success",
             message="Product retrieved successfully",
             data=product_data
         )
     except Exception as e:
-        return ProductResponse(
+        return SingleProductResponse(
             status="error",
             message=str(e),
             data=None
         )
     
 
-def get_all_categories(db: Session) -> CategoryResponse:
+async def get_product_version(db: AsyncSession, product_id: int):
+    """(version, updated_at) of a product, or None. A primary key lookup that never loads the row."""
+    return (await db.execute(
+        select(Product.version, Product.updated_at).where(Product.id == product_id)
+    )).first()
+
+
+async def get_products_json(db: AsyncSession, product_ids: List[int], fields: Optional[List[str]] = None) -> Dict[int, bytes]:
+    """Serialized products by id, shared with the /product/{id} cache.
+
+    Cache misses are resolved with a single IN (...) query and written back to
+    the cache. Ids that don't exist are absent from the result. Sparse fieldsets
+    are read straight from the database and never cached.
+    """
+    if len(product_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} ids per batch")
+
+    if fields is not None:
+        rows = (await db.execute(select(*product_columns(fields)).where(Product.id.in_(product_ids)))).all()
+        return {
+            row.id: json_dumps(item)
+            for row, item in zip(rows, serialize_products(rows, fields))
+        }
+
+    return {product_id: cached.body for product_id, cached in (await get_cached_products(db, product_ids)).items()}
+
+
+async def get_cached_products(db: AsyncSession, product_ids: List[int]) -> Dict[int, CachedBody]:
+    """Whole products by id as cache entries, each with the version it was read at.
+
+    Only misses reach the database, in one IN (...) query that reads every
+    product together with its version, and they are written back to the cache.
+    """
+    found = {}
+    misses = []
+    for product_id in product_ids:
+        cached = product_cache.get(product_key(product_id))
+        if cached is None:
+            misses.append(product_id)
+        else:
+            found[product_id] = cached
+
+    if misses:
+        stmt = select(*product_columns(None, Product.version, Product.updated_at)).where(Product.id.in_(misses))
+        rows = (await db.execute(stmt)).all()
+        for row, item in zip(rows, serialize_products(rows, None)):
+            cached = CachedBody(json_dumps(item), row.version, row.updated_at)
+            cache_body(product_key(row.id), cached)
+            found[row.id] = cached
+    return found
+
+
+def _category_stats_query(db: AsyncSession):
+    if db.get_bind().dialect.name == "sqlite":
+        # Maintained by triggers, see app.database.category_stats
+        stats = category_stats.c
+        return select(
+            stats.category,
+            stats.product_count,
+            stats.min_price,
+            stats.max_price,
+            (stats.price_sum / func.nullif(stats.price_count, 0)).label("avg_price"),
+            stats.in_stock_count,
+        ).order_by(stats.category)
+
+    return select(
+        Product.category.label("category"),
+        func.count().label("product_count"),
+        func.min(Product.price).label("min_price"),
+        func.max(Product.price).label("max_price"),
+        func.avg(Product.price).label("avg_price"),
+        func.sum(case((Product.stockQuantity > 0, 1), else_=0)).label("in_stock_count"),
+    ).where(Product.category.isnot(None)).group_by(Product.category).order_by(Product.category)
+
+
+async def get_all_categories(db: AsyncSession) -> CategoryResponse:
     try:
-        categories = db.query(distinct(Product.category)).all()
-        category_list = [category[0] for category in categories]
+        stats = [CategoryStats(**row._mapping) for row in await db.execute(_category_stats_query(db))]
+        category_list = [category.category for category in stats]
         
         return CategoryResponse(
             status="success",
             message="Categories retrieved successfully",
-            data=category_list
+            data=category_list,
+            stats=stats
         )
     except Exception as e:
         return CategoryResponse(
@@ -168,15 +473,19 @@ def get_all_categories(db: Session) -> CategoryResponse:
             data=None
         )
 
-def get_products_by_category(db: Session, category: str) -> ProductResponse:
+async def get_products_by_category(db: AsyncSession, category: str, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None) -> ProductResponse:
     try:
-        products = db.query(Product).filter(Product.category == category).all()
-        product_list = [ProductBase.from_orm(product) for product in products]
+        # Equality on category plus ordering by id is a range on ix_products_category_id
+        stmt = select(*product_columns(fields)).where(Product.category == category)
+        keys = [("id", Product.id, False)]
+        rows, next_cursor = await paginate(db, stmt, keys, cursor, page_size, scalars=False)
+        product_list = serialize_products(rows, fields)
         
         return ProductResponse(
             status="success",
             message="Products retrieved successfully",
-            data=product_list
+            data=product_list,
+            next_cursor=next_cursor
         )
     except Exception as e:
         return ProductResponse(
@@ -187,10 +496,10 @@ def get_products_by_category(db: Session, category: str) -> ProductResponse:
     
 
 
-def get_limited_products(db: Session, limit: int) -> ProductResponse:
+async def get_limited_products(db: AsyncSession, limit: int, fields: Optional[List[str]] = None) -> ProductResponse:
     try:
-        products = db.query(Product).limit(limit).all()
-        product_list = [ProductBase.from_orm(product) for product in products]
+        rows = (await db.execute(select(*product_columns(fields)).limit(limit))).all()
+        product_list = serialize_products(rows, fields)
         
         return ProductResponse(
             status="success",
@@ -205,25 +514,23 @@ def get_limited_products(db: Session, limit: int) -> ProductResponse:
         )
     
 
-def get_sorted_products(db: Session, sort_by: str, order: str) -> ProductResponse:
+async def get_sorted_products(db: AsyncSession, sort: str, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None) -> ProductResponse:
     try:
-        if order == 'asc':
-            products = db.query(Product).order_by(getattr(Product, sort_by).asc()).all()
-        elif order == 'desc':
-            products = db.query(Product).order_by(getattr(Product, sort_by).desc()).all()
+        keys = parse_sort(sort)
+        # Sort columns are selected even when not requested; the next cursor is built from them
+        stmt = select(*product_columns(fields, *(column for _, column, _ in keys)))
+        snapshot = await product_snapshot.get(db)
+        if snapshot is not None and snapshot.can_sort(keys):
+            rows, next_cursor = await paginate_snapshot(db, snapshot, stmt, keys, cursor, page_size)
         else:
-            return ProductResponse(
-                status="error",
-                message="Invalid order parameter. Use 'asc' or 'desc'.",
-                data=None
-            )
-        
-        product_list = [ProductBase.from_orm(product) for product in products]
+            rows, next_cursor = await paginate(db, stmt, keys, cursor, page_size, scalars=False)
+        product_list = serialize_products(rows, fields)
         
         return ProductResponse(
             status="success",
             message="Sorted products retrieved successfully",
-            data=product_list
+            data=product_list,
+            next_cursor=next_cursor
         )
     except Exception as e:
         return ProductResponse(
@@ -231,7 +538,132 @@ def get_sorted_products(db: Session, sort_by: str, order: str) -> ProductRespons
             message=str(e),
             data=None
         )
-    
 
 
-    
\ No newline at end of file
+async def search_products(db: AsyncSession, q: str, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None) -> ProductResponse:
+    try:
+        if db.get_bind().dialect.name != "sqlite":
+            raise ValueError("Search requires the SQLite FTS5 index")
+
+        # Best bm25 match first (FTS5 ranks are negative), ties broken by id
+        stmt = (
+            select(*product_columns(fields), products_fts.c.rank.label("rank"))
+            .join(products_fts, products_fts.c.rowid == Product.id)
+            .where(products_fts.c.products_fts.match(build_match_query(q)))
+        )
+        keys = [("rank", products_fts.c.rank, False), ("id", Product.id, False)]
+        rows, next_cursor = await paginate(db, stmt, keys, cursor, page_size, scalars=False)
+        product_list = serialize_products(rows, fields)
+
+        return ProductResponse(
+            status="success",
+            message="Search results retrieved successfully",
+            data=product_list,
+            next_cursor=next_cursor
+        )
+    except Exception as e:
+        return ProductResponse(
+            status="error",
+            message=str(e),
+            data=None
+        )
+
+
+async def get_product_changes(db: AsyncSession, since: int = 0, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None) -> ChangesResponse:
+    """Products written or deleted after change `since`, oldest change first.
+
+    Each product appears once, at its latest change, so a page costs the same
+    however often the product was written. Deleted products come back as
+    tombstones without data.
+    """
+    try:
+        if db.get_bind().dialect.name != "sqlite":
+            raise ValueError("The change feed requires SQLite")
+
+        changes = product_changes.c
+        # Product columns first, as serialize_products expects; the change columns trail
+        stmt = (
+            select(*product_columns(fields), changes.seq, changes.product_id, changes.deleted, changes.changed_at)
+            .select_from(product_changes.outerjoin(Product, Product.id == changes.product_id))
+            .where(changes.seq > since)
+            .order_by(changes.seq)
+            .limit(page_size + 1)
+        )
+        rows = (await db.execute(stmt)).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        change_list = [
+            {
+                "seq": row.seq,
+                "id": row.product_id,
+                "deleted": bool(row.deleted),
+                "changed_at": row.changed_at,
+                "product": None if row.deleted else item,
+            }
+            for row, item in zip(rows, serialize_products(rows, fields))
+        ]
+        return ChangesResponse(
+            status="success",
+            message="Changes retrieved successfully",
+            data=change_list,
+            next_since=rows[-1].seq if rows else since,
+            has_more=has_more
+        )
+    except Exception as e:
+        return ChangesResponse(
+            status="error",
+            message=str(e),
+            data=None
+        )
+
+
+async def query_products(db: AsyncSession, filters: ProductFilters, with_facets: bool = False, cursor: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, fields: Optional[List[str]] = None) -> ProductQueryResponse:
+    try:
+        keys = [("id", Product.id, False)]
+        snapshot = await product_snapshot.get(db)
+        if snapshot is not None:
+            # Matching ids come from the snapshot; only the page is read by primary key
+            stmt = select(*product_columns(fields))
+            rows, next_cursor = await paginate_snapshot(db, snapshot, stmt, keys, cursor, page_size, snapshot.mask(filters))
+            facets = snapshot.facet_counts(filters) if with_facets else None
+        else:
+            stmt = select(*product_columns(fields)).where(*filter_conditions(filters))
+            rows, next_cursor = await paginate(db, stmt, keys, cursor, page_size, scalars=False)
+            facets = await facet_counts(db, filters) if with_facets else None
+        product_list = serialize_products(rows, fields)
+
+        return ProductQueryResponse(
+            status="success",
+            message="Products retrieved successfully",
+            data=product_list,
+            next_cursor=next_cursor,
+            facets=facets
+        )
+    except Exception as e:
+        return ProductQueryResponse(
+            status="error",
+            message=str(e),
+            data=None
+        )
+
+
+async def get_product_stats(db: AsyncSession, query: StatsQuery, filters: ProductFilters) -> StatsResponse:
+    try:
+        snapshot = await product_snapshot.get(db)
+        if snapshot is not None:
+            stats = snapshot_stats(snapshot, query, filters)
+        else:
+            stats = await sql_stats(db, query, filters)
+
+        return StatsResponse(
+            status="success",
+            message="Product statistics retrieved successfully",
+            data=stats
+        )
+    except Exception as e:
+        return StatsResponse(
+            status="error",
+            message=str(e),
+            data=None
+        )
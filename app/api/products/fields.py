@@ -0,0 +1,84 @@
+# app/api/products/fields.py
+
+from typing import Iterable, List, Optional
+from app.database.models.products import Product
+
+# Allow-list for ?fields=: response field -> Product columns it is built from
+FIELD_COLUMNS = {
+    "id": ("id",),
+    "title": ("title",),
+    "price": ("price",),
+    "description": ("description",),
+    "brand": ("brand",),
+    "model": ("model",),
+    "color": ("color",),
+    "category": ("category",),
+    "image_ref": ("image_ref",),
+    "discountPercentage": ("discountPercentage",),
+    "stockQuantity": ("stockQuantity",),
+    "rating": ("rating_rate", "rating_count"),
+    "availabilityStatus": ("availabilityStatus",),
+}
+
+# Every field, in ProductBase's order
+PRODUCT_FIELDS = list(FIELD_COLUMNS)
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated ?fields= value. None means every field."""
+    if value is None:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in FIELD_COLUMNS]
+    if unknown or not fields:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+            f"Allowed: {', '.join(FIELD_COLUMNS)}"
+        )
+    return fields
+
+
+def product_columns(fields: Optional[List[str]], *extra_columns) -> list:
+    """Product columns for a Core select() of `fields`, in response order.
+
+    `extra_columns` follow the requested ones without being returned, e.g. sort
+    keys the next cursor is built from. The primary key is always selected.
+    """
+    columns = [getattr(Product, name) for field in fields or PRODUCT_FIELDS for name in FIELD_COLUMNS[field]]
+    selected = {column.key for column in columns}
+    for column in (Product.id, *extra_columns):
+        if column.key not in selected:
+            selected.add(column.key)
+            columns.append(column)
+    return columns
+
+
+def _row_names(fields: List[str]) -> List[str]:
+    # One name per selected column; the rating count gets a placeholder key that
+    # is folded into the nested rating afterwards
+    names = []
+    for field in fields:
+        names.append(field)
+        if field == "rating":
+            names.append("\0rating_count")
+    return names
+
+
+def serialize_products(rows: Iterable, fields: Optional[List[str]]) -> list:
+    """Plain dicts in the shape of ProductBase from rows of product_columns(fields).
+
+    Rows are Core rows (named tuples), never ORM instances, so nothing is hydrated
+    or tracked by the session. Extra trailing columns are dropped. The response
+    envelope and FastJSONResponse take the dicts without a validation pass.
+    """
+    fields = fields or PRODUCT_FIELDS
+    names = _row_names(fields)
+    has_rating = "rating" in fields
+    products = []
+    for row in rows:
+        item = dict(zip(names, row))
+        if has_rating:
+            rate, count = item["rating"], item.pop("\0rating_count")
+            item["rating"] = None if rate is None and count is None else {"rate": rate, "count": count}
+        products.append(item)
+    return products
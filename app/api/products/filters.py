@@ -0,0 +1,69 @@
+# app/api/products/filters.py
+
+import operator
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.models.products import Product
+from app.schemas.product import ProductFilters
+
+FACET_COLUMNS = {
+    "brand": Product.brand,
+    "color": Product.color,
+    "category": Product.category,
+    "availabilityStatus": Product.availabilityStatus,
+}
+
+DEFAULT_FACET_LIMIT = 20
+
+# Range predicates: filter field -> (column, operator)
+_RANGES = {
+    "price_min": (Product.price, operator.ge),
+    "price_max": (Product.price, operator.le),
+    "rating_min": (Product.rating_rate, operator.ge),
+    "rating_max": (Product.rating_rate, operator.le),
+    "discount_min": (Product.discountPercentage, operator.ge),
+    "discount_max": (Product.discountPercentage, operator.le),
+    "stock_min": (Product.stockQuantity, operator.ge),
+    "stock_max": (Product.stockQuantity, operator.le),
+}
+
+
+def filter_conditions(filters: ProductFilters, exclude: Optional[str] = None) -> List:
+    """SQL predicates for `filters`, optionally leaving out one facet's own filter."""
+    conditions = []
+    for name, column in FACET_COLUMNS.items():
+        values = getattr(filters, name)
+        if values and name != exclude:
+            conditions.append(column.in_(values))
+
+    for name, (column, compare) in _RANGES.items():
+        value = getattr(filters, name)
+        if value is not None:
+            conditions.append(compare(column, value))
+
+    if filters.in_stock is True:
+        conditions.append(Product.stockQuantity > 0)
+    elif filters.in_stock is False:
+        conditions.append(func.coalesce(Product.stockQuantity, 0) <= 0)
+    return conditions
+
+
+async def facet_counts(db: AsyncSession, filters: ProductFilters, limit: int = DEFAULT_FACET_LIMIT) -> Dict[str, Dict[str, int]]:
+    """Product counts per facet value, most common first.
+
+    Each facet ignores its own filter, so picking one brand still shows how many
+    products the other brands would add.
+    """
+    facets = {}
+    for name, column in FACET_COLUMNS.items():
+        count = func.count().label("count")
+        rows = (await db.execute(
+            select(column, count)
+            .where(column.isnot(None), *filter_conditions(filters, exclude=name))
+            .group_by(column)
+            .order_by(count.desc(), column)
+            .limit(limit)
+        )).all()
+        facets[name] = {value: total for value, total in rows}
+    return facets
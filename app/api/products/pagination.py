@@ -0,0 +1,109 @@
+# app/api/products/pagination.py
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# A sort key is (name, column, descending). The last key must be unique (Product.id)
+# so that every row has exactly one position in the ordering.
+SortKey = Tuple[str, Any, bool]
+
+
+def encode_cursor(keys: Sequence[str], values: Sequence[Any]) -> str:
+    payload = json.dumps({"k": list(keys), "v": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        cursor_keys, values = payload["k"], payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if cursor_keys != list(keys) or not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("Cursor does not match the requested ordering")
+    return values
+
+
+def order_by_keys(keys: Sequence[SortKey]) -> list:
+    # NULLs sort as the smallest value, which is how SQLite lays them out in an index
+    return [
+        column.desc().nulls_last() if descending else column.asc().nulls_first()
+        for _, column, descending in keys
+    ]
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column, value, descending: bool, null_tail: bool = True):
+    if descending:
+        if value is None:
+            return false()
+        return or_(column < value, column.is_(None)) if null_tail else column < value
+    if value is None:
+        return column.isnot(None)
+    return column > value
+
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any], null_tail: bool = True):
+    """Rows strictly after `values` in the ordering given by `keys`.
+
+    With `null_tail=False` the NULL rows that trail a descending first key are left
+    out, so the condition stays an index range on that key.
+    """
+    clauses = []
+    for i, (_, column, descending) in enumerate(keys):
+        prefix = [_equal(col, value) for (_, col, _), value in zip(keys[:i], values[:i])]
+        clauses.append(and_(*prefix, _after(column, values[i], descending, null_tail or i > 0)))
+    condition = or_(*clauses)
+
+    # The OR alone makes SQLite sort every candidate row. Bounding the first key
+    # as well (implied by the OR) keeps it a range scan on that key's index.
+    _, column, descending = keys[0]
+    if len(keys) > 2 and values[0] is not None and not (descending and null_tail):
+        condition = and_(column <= values[0] if descending else column >= values[0], condition)
+    return condition
+
+
+async def paginate(db: AsyncSession, stmt, keys: Sequence[SortKey], cursor: Optional[str], page_size: int, scalars: bool = True):
+    """Return one page of `stmt` after `cursor`, plus the cursor for the next page.
+
+    With `scalars=False` whole rows are returned; each key name must then be a
+    label on the row.
+    """
+    async def fetch(query):
+        result = await db.execute(query)
+        return list(result.scalars() if scalars else result)
+
+    if page_size < 1 or page_size > MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    names = [name for name, _, _ in keys]
+    ordered = stmt.order_by(*order_by_keys(keys))
+
+    if cursor is None:
+        rows = await fetch(ordered.limit(page_size + 1))
+    else:
+        values = decode_cursor(cursor, names)
+        rows = await fetch(ordered.where(keyset_condition(keys, values, null_tail=False)).limit(page_size + 1))
+
+        # Fetch the NULL tail of a descending first key separately instead of letting
+        # an OR turn the range search into an index scan.
+        _, first_column, first_descending = keys[0]
+        if first_descending and values[0] is not None and len(rows) <= page_size:
+            rows += await fetch(ordered.where(first_column.is_(None)).limit(page_size + 1 - len(rows)))
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(names, [getattr(rows[-1], name) for name in names])
+    return rows, next_cursor
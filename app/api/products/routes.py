@@ -1,80 +1,362 @@
 # app/api/products/routes.py
 
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database.config import get_db 
-from app.schemas.product import CategoryResponse, ProductCreate, ProductResponse, ProductUpdate, ProductsResponse, SingleProductResponse
-from app.api.products.controllers import create_product, delete_product, get_all_categories, get_all_products, get_limited_products, get_product_by_id, get_products_by_category, get_sorted_products, update_product
+from app.api.products.cache import CATEGORIES_KEY, CachedBody, cache_body, category_key, product_cache, success_envelope
+from app.core.blob_store import blob_store, image_content_type
+from app.core.conditional import is_not_modified, make_etag, validator_headers
+from app.core.responses import NDJSON_MEDIA_TYPE, FastJSONResponse, fast_json, json_dumps
+from app.core.security import get_current_user
+from app.database.catalog_state import read_catalog_state
+from app.database.config import get_async_db, get_db
+from app.database.models import User
+from app.helper.stream_helper import AsyncStreamReader
+from app.api.products.fields import parse_fields
+from app.api.products.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.api.products.stats import parse_stats_query, stats_key
+from app.schemas.product import BulkImportResponse, CategoryResponse, ChangesResponse, ProductBatchRequest, ProductBatchResponse, ProductCreate, ProductFilters, ProductQueryResponse, ProductResponse, ProductUpdate, ProductsResponse, SingleProductResponse, StatsResponse
+from app.api.products.controllers import bulk_import_products, create_product, delete_product, get_all_categories, get_all_products, get_cached_products, get_limited_products, get_product_by_id, get_product_changes, get_product_stats, get_product_version, get_products_by_category, get_products_json, get_sorted_products, patch_product, query_products, search_products, stream_products, update_product
+
+product = APIRouter(default_response_class=FastJSONResponse)
+
+# Blobs are content-addressed and never change, so clients may cache them forever
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+async def _catalog_validators(db: AsyncSession, *parts) -> Optional[Tuple[str, datetime]]:
+    # Any product write moves the catalog generation, so it stands in for the
+    # content of every listing; None where the generation isn't tracked.
+    state = await read_catalog_state(db)
+    if state is None:
+        return None
+    return make_etag(state.generation, *parts), state.updated_at
+
+
+async def _cached_listing(request: Request, db: AsyncSession, key: tuple, read) -> Response:
+    # A listing cached with the generation it was read at; see CachedBody
+    cached = product_cache.get(key)
+    if cached is None:
+        state = await read_catalog_state(db)
+        response = await read()
+        if response.status == "error":
+            raise HTTPException(status_code=400, detail=response.message)
+        cached = CachedBody(json_dumps(response), *(state or (None, None)))
+        # A write between the two reads could leave the body newer than the
+        # generation; such a response is still sent, but not cached
+        if state is None or (await read_catalog_state(db)).generation == state.generation:
+            cache_body(key, cached)
+
+    if cached.version is None:
+        return Response(content=cached.body, media_type="application/json")
+    validators = make_etag(cached.version, *key), cached.updated_at
+    headers = validator_headers(*validators)
+    if is_not_modified(request, *validators):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def requested_fields(fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,price")) -> Optional[List[str]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-product = APIRouter()
 
 @product.post("/add/product", response_model=SingleProductResponse)
-def add_product(product: ProductCreate, db: Session = Depends(get_db)):
-    response = create_product(db, product)
+async def add_product(product: ProductCreate, db: AsyncSession = Depends(get_async_db)):
+    response = await create_product(db, product)
+    if response.status == "error":
+        raise HTTPException(status_code=400, detail=response.message)
+    return fast_json(response)
+
+@product.post("/bulk", response_model=BulkImportResponse)
+async def bulk_import_route(request: Request, format: Optional[str] = None, db: Session = Depends(get_db)):
+    # Raw request body: curl --data-binary @products.csv -H "Content-Type: text/csv"
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    # Rows are parsed and inserted as the body arrives, never buffering the whole upload
+    upload = io.BufferedReader(AsyncStreamReader(request.stream()))
+    response = await run_in_threadpool(bulk_import_products, db, upload, format)
+
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
 
-@product.put("/update/{product_id}", response_model=ProductResponse)
-def update_product_route(product_id: int, product_update: ProductUpdate, db: Session = Depends(get_db)):
-    response = update_product(db, product_id, product_update)
+
+@product.put("/update/{product_id}", response_model=SingleProductResponse)
+async def update_product_route(product_id: int, product_update: ProductUpdate, db: AsyncSession = Depends(get_async_db)):
+    response = await update_product(db, product_id, product_update)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
+
+
+@product.patch("/{product_id:int}", response_model=SingleProductResponse)
+async def patch_product_route(product_id: int, product_update: ProductUpdate, db: AsyncSession = Depends(get_async_db)):
+    response = await patch_product(db, product_id, product_update)
+    if response.status == "error":
+        status_code = 404 if response.message == "Product not found" else 400
+        raise HTTPException(status_code=status_code, detail=response.message)
+    return fast_json(response)
 
 
 @product.delete("/delete/{product_id}", response_model=ProductResponse)
-def delete_product_route(product_id: int, db: Session = Depends(get_db)):
-    response = delete_product(db, product_id)
+async def delete_product_route(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    response = await delete_product(db, product_id)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
 
 
 @product.get("/all/products", response_model=ProductsResponse)
-def get_all_products_route(db: Session = Depends(get_db)):
-    response = get_all_products(db)
+async def get_all_products_route(
+    request: Request,
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    ndjson = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    validators = await _catalog_validators(db, "products", ndjson, cursor, page_size, fields)
+    headers = {"Vary": "Accept", **(validator_headers(*validators) if validators else {})}
+    if validators and is_not_modified(request, *validators):
+        return Response(status_code=304, headers=headers)
+
+    if ndjson:
+        return StreamingResponse(stream_products(fields=fields), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    response = await get_all_products(db, cursor, page_size, fields)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response, headers=headers)
+
 
+@product.get("/all/products/stream")
+async def stream_all_products_route(fields: Optional[List[str]] = Depends(requested_fields)):
+    return StreamingResponse(stream_products(fields=fields), media_type=NDJSON_MEDIA_TYPE)
 
-@product.get("/product/{product_id}", response_model=ProductResponse)
-def get_product_route(product_id: int, db: Session = Depends(get_db)):
-    response = get_product_by_id(db, product_id)
+
+@product.get("/product/{product_id}", response_model=SingleProductResponse)
+async def get_product_route(request: Request, product_id: int, fields: Optional[List[str]] = Depends(requested_fields), db: AsyncSession = Depends(get_async_db)):
+    if fields is None:
+        # Whole products are cached with their version, so a hit is answered without the database
+        cached = (await get_cached_products(db, [product_id])).get(product_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        etag = make_etag("product", product_id, cached.version, fields)
+        headers = validator_headers(etag, cached.updated_at)
+        if is_not_modified(request, etag, cached.updated_at):
+            return Response(status_code=304, headers=headers)
+        return Response(content=success_envelope("Product retrieved successfully", cached.body), media_type="application/json", headers=headers)
+
+    # Sparse responses skip the cache; revalidation only reads the version, never the product itself
+    version = await get_product_version(db, product_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    etag = make_etag("product", product_id, version.version, fields)
+    headers = validator_headers(etag, version.updated_at)
+    if is_not_modified(request, etag, version.updated_at):
+        return Response(status_code=304, headers=headers)
+
+    response = await get_product_by_id(db, product_id, fields)
     if response.status == "error":
         raise HTTPException(status_code=404, detail=response.message)
-    return response
+    return fast_json(response, headers=headers)
+
+
+async def _batch_response(product_ids: List[int], fields: Optional[List[str]], db: AsyncSession) -> Response:
+    # Duplicates are answered once, in the position of their first occurrence
+    product_ids = list(dict.fromkeys(product_ids))
+    try:
+        found = await get_products_json(db, product_ids, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    data = b"[" + b",".join(found[product_id] for product_id in product_ids if product_id in found) + b"]"
+    missing = [product_id for product_id in product_ids if product_id not in found]
+    body = success_envelope("Products retrieved successfully", data, missing=missing)
+    return Response(content=body, media_type="application/json")
+
+
+@product.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch_route(
+    ids: str = Query(..., description="Comma-separated product ids"),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        product_ids = [int(product_id) for product_id in ids.split(",") if product_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    return await _batch_response(product_ids, fields, db)
+
+
+@product.post("/batch", response_model=ProductBatchResponse)
+async def post_products_batch_route(request: ProductBatchRequest, fields: Optional[List[str]] = Depends(requested_fields), db: AsyncSession = Depends(get_async_db)):
+    return await _batch_response(request.ids, fields, db)
 
 
 @product.get("/categories", response_model=CategoryResponse)
-def get_all_categories_route(db: Session = Depends(get_db)):
-    response = get_all_categories(db)
+async def get_all_categories_route(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _cached_listing(request, db, CATEGORIES_KEY, lambda: get_all_categories(db))
+
+@product.get("/category/{category}", response_model=ProductResponse)
+async def get_products_by_category_route(
+    request: Request,
+    category: str,
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    key = category_key(category, cursor, page_size, fields)
+    return await _cached_listing(request, db, key, lambda: get_products_by_category(db, category, cursor, page_size, fields))
+
+
+@product.get("/cache/stats")
+async def get_cache_stats_route(current_user: User = Depends(get_current_user)):
+    return product_cache.stats()
+
+
+@product.get("/limited", response_model=ProductResponse)
+async def get_limited_products_route(limit: int = 10, fields: Optional[List[str]] = Depends(requested_fields), db: AsyncSession = Depends(get_async_db)):
+    response = await get_limited_products(db, limit, fields)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
 
-@product.get("/category/{category}", response_model=ProductResponse)
-def get_products_by_category_route(category: str, db: Session = Depends(get_db)):
-    response = get_products_by_category(db, category)
+
+@product.get("/sorted", response_model=ProductResponse)
+async def get_sorted_products_route(
+    sort: Optional[str] = Query(None, description="Comma-separated sort keys, '-' for descending, e.g. -rating_rate,price"),
+    sort_by: str = 'price',
+    order: str = 'asc',
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if sort is None:
+        # sort_by/order predate ?sort= and are kept for existing clients
+        if order not in ('asc', 'desc'):
+            raise HTTPException(status_code=400, detail="Invalid order parameter. Use 'asc' or 'desc'.")
+        sort = f"-{sort_by}" if order == 'desc' else sort_by
+
+    response = await get_sorted_products(db, sort, cursor, page_size, fields)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
 
 
-@product.get("/limited", response_model=ProductResponse)
-def get_limited_products_route(limit: int = 10, db: Session = Depends(get_db)):
-    response = get_limited_products(db, limit)
+@product.get("/search", response_model=ProductResponse)
+async def search_products_route(
+    q: str = Query(..., min_length=1),
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    response = await search_products(db, q, cursor, page_size, fields)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
 
 
-@product.get("/sorted", response_model=ProductResponse)
-def get_sorted_products_route(sort_by: str = 'price', order: str = 'asc', db: Session = Depends(get_db)):
-    response = get_sorted_products(db, sort_by, order)
+def product_filters(
+    category: Optional[List[str]] = Query(None),
+    brand: Optional[List[str]] = Query(None),
+    color: Optional[List[str]] = Query(None),
+    availabilityStatus: Optional[List[str]] = Query(None),
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    rating_min: Optional[float] = None,
+    rating_max: Optional[float] = None,
+    discount_min: Optional[float] = None,
+    discount_max: Optional[float] = None,
+    stock_min: Optional[int] = None,
+    stock_max: Optional[int] = None,
+    in_stock: Optional[bool] = None
+) -> ProductFilters:
+    return ProductFilters(
+        category=category,
+        brand=brand,
+        color=color,
+        availabilityStatus=availabilityStatus,
+        price_min=price_min,
+        price_max=price_max,
+        rating_min=rating_min,
+        rating_max=rating_max,
+        discount_min=discount_min,
+        discount_max=discount_max,
+        stock_min=stock_min,
+        stock_max=stock_max,
+        in_stock=in_stock
+    )
+
+
+@product.get("/query", response_model=ProductQueryResponse)
+async def query_products_route(
+    filters: ProductFilters = Depends(product_filters),
+    facets: bool = False,
+    cursor: Optional[str] = None,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    response = await query_products(db, filters, facets, cursor, page_size, fields)
     if response.status == "error":
         raise HTTPException(status_code=400, detail=response.message)
-    return response
+    return fast_json(response)
+
+
+@product.get("/changes", response_model=ChangesResponse)
+async def get_product_changes_route(
+    since: int = Query(0, ge=0, description="Last seq already applied; 0 for the whole catalog"),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: AsyncSession = Depends(get_async_db)
+):
+    response = await get_product_changes(db, since, page_size, fields)
+    if response.status == "error":
+        raise HTTPException(status_code=400, detail=response.message)
+    return fast_json(response)
+
+
+@product.get("/stats", response_model=StatsResponse)
+async def get_product_stats_route(
+    request: Request,
+    filters: ProductFilters = Depends(product_filters),
+    group_by: Optional[str] = Query(None, description="Comma-separated dimensions, e.g. category,brand"),
+    histogram: Optional[List[str]] = Query(None, description="Metric and optional bucket boundaries, e.g. price:0,50,100"),
+    percentiles: Optional[List[str]] = Query(None, description="Metric and optional percentiles, e.g. rating_rate:50,90,99"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        query = parse_stats_query(group_by, histogram, percentiles)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await _cached_listing(request, db, stats_key(query, filters), lambda: get_product_stats(db, query, filters))
+
+
+@product.get("/images/{image_ref}")
+def get_product_image_route(image_ref: str, request: Request):
+    if not blob_store.exists(image_ref):
+        raise HTTPException(status_code=404, detail="Image not found")
 
+    headers = {"ETag": f'"{image_ref}"', "Cache-Control": IMAGE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
 
+    # FileResponse handles Range requests and hands the file to the server via
+    # pathsend when supported instead of copying it through Python.
+    path = blob_store.path(image_ref)
+    return FileResponse(path, media_type=image_content_type(path), headers=headers)
@@ -0,0 +1,330 @@
+# app/api/products/snapshot.py
+
+import asyncio
+import math
+import operator
+import os
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.products.filters import DEFAULT_FACET_LIMIT, FACET_COLUMNS
+from app.api.products.pagination import MAX_PAGE_SIZE, SortKey, decode_cursor, encode_cursor
+from app.database.catalog_state import read_catalog_state
+from app.database.models.products import Product
+from app.schemas.product import ProductFilters
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install numpy
+    np = None
+
+load_dotenv("env/.env")
+
+# Off unless PRODUCT_SNAPSHOT=1, and only where NumPy is installed
+PRODUCT_SNAPSHOT = os.getenv("PRODUCT_SNAPSHOT", "0") == "1"
+
+NUMERIC_COLUMNS = ("price", "rating_rate", "discountPercentage", "stockQuantity")
+ENCODED_COLUMNS = tuple(FACET_COLUMNS)  # brand, color, category, availabilityStatus
+SNAPSHOT_COLUMNS = [Product.id] + [getattr(Product, name) for name in NUMERIC_COLUMNS + ENCODED_COLUMNS]
+
+# Sort keys the snapshot can order by; anything else (title) goes to the database
+SNAPSHOT_SORT_KEYS = {"id", "category", *NUMERIC_COLUMNS}
+
+# Range filters: filter field -> (column, operator), as in filters._RANGES
+_RANGES = {
+    "price_min": ("price", operator.ge),
+    "price_max": ("price", operator.le),
+    "rating_min": ("rating_rate", operator.ge),
+    "rating_max": ("rating_rate", operator.le),
+    "discount_min": ("discountPercentage", operator.ge),
+    "discount_max": ("discountPercentage", operator.le),
+    "stock_min": ("stockQuantity", operator.ge),
+    "stock_max": ("stockQuantity", operator.le),
+}
+
+
+class Dictionary:
+    """Distinct strings of one column; rows hold their index, -1 for NULL."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self._sorted = None
+        self._ranks = None
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self._sorted = self._ranks = None
+        return code
+
+    def lookup(self, values: Sequence[str]) -> list:
+        return [self.codes[value] for value in values if value in self.codes]
+
+    def ranks(self):
+        """Position of each code in sorted order, so codes can be compared as strings."""
+        if self._ranks is None:
+            self._sorted = sorted(self.values)
+            order = sorted(range(len(self.values)), key=self.values.__getitem__)
+            self._ranks = np.empty(len(self.values), dtype=np.float64)
+            self._ranks[order] = np.arange(len(self.values))
+        return self._ranks
+
+    def rank(self, value: str) -> float:
+        # Values no longer in the dictionary (a cursor from an older catalog) fall
+        # between their neighbours
+        self.ranks()
+        ordered = self._sorted
+        position = bisect_left(ordered, value)
+        if position < len(ordered) and ordered[position] == value:
+            return float(position)
+        return position - 0.5
+
+
+class ProductSnapshot:
+    """Columnar copy of the products table for vectorized filters and sorts.
+
+    Numeric columns are float64 arrays with NaN for NULL; string columns are
+    dictionary encoded. Rows are appended or overwritten in place and deleted
+    rows are only masked out, so a write touches O(1) entries.
+    """
+
+    def __init__(self, generation: int, capacity: int = 1024):
+        self.generation = generation
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.numeric = {name: np.full(capacity, np.nan) for name in NUMERIC_COLUMNS}
+        self.encoded = {name: np.full(capacity, -1, dtype=np.int32) for name in ENCODED_COLUMNS}
+        self.dictionaries = {name: Dictionary() for name in ENCODED_COLUMNS}
+        self.positions: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        self.ids = np.resize(self.ids, capacity)
+        self.alive = np.concatenate([self.alive, np.zeros(capacity - len(self.alive), dtype=bool)])
+        for name, array in self.numeric.items():
+            self.numeric[name] = np.concatenate([array, np.full(capacity - len(array), np.nan)])
+        for name, array in self.encoded.items():
+            self.encoded[name] = np.concatenate([array, np.full(capacity - len(array), -1, dtype=np.int32)])
+
+    def upsert(self, row):
+        """Write one row of SNAPSHOT_COLUMNS."""
+        position = self.positions.get(row.id)
+        if position is None:
+            if self.size == len(self.ids):
+                self._grow()
+            position = self.positions[row.id] = self.size
+            self.size += 1
+            self.ids[position] = row.id
+        self.alive[position] = True
+        for name in NUMERIC_COLUMNS:
+            value = getattr(row, name)
+            self.numeric[name][position] = np.nan if value is None else value
+        for name in ENCODED_COLUMNS:
+            self.encoded[name][position] = self.dictionaries[name].encode(getattr(row, name))
+
+    def remove(self, product_id: int):
+        position = self.positions.pop(product_id, None)
+        if position is not None:
+            self.alive[position] = False
+
+    def mask(self, filters: ProductFilters, exclude: Optional[str] = None):
+        """Rows matching `filters`, with the same NULL semantics as filter_conditions."""
+        n = self.size
+        selected = self.alive[:n].copy()
+        for name in ENCODED_COLUMNS:
+            values = getattr(filters, name)
+            if values and name != exclude:
+                selected &= np.isin(self.encoded[name][:n], self.dictionaries[name].lookup(values))
+
+        for field, (name, compare) in _RANGES.items():
+            value = getattr(filters, field)
+            if value is not None:
+                # NaN compares false, like NULL in SQL
+                selected &= compare(self.numeric[name][:n], value)
+
+        stock = self.numeric["stockQuantity"][:n]
+        if filters.in_stock is True:
+            selected &= stock > 0
+        elif filters.in_stock is False:
+            selected &= np.nan_to_num(stock, nan=0.0) <= 0
+        return selected
+
+    def facet_counts(self, filters: ProductFilters, limit: int = DEFAULT_FACET_LIMIT) -> Dict[str, Dict[str, int]]:
+        """Same result as filters.facet_counts, from one bincount per facet."""
+        facets = {}
+        for name in ENCODED_COLUMNS:
+            codes = self.encoded[name][:self.size][self.mask(filters, exclude=name)]
+            dictionary = self.dictionaries[name]
+            counts = np.bincount(codes[codes >= 0], minlength=len(dictionary.values))
+            present = np.flatnonzero(counts)
+            top = sorted(present.tolist(), key=lambda code: (-counts[code], dictionary.values[code]))[:limit]
+            facets[name] = {dictionary.values[code]: int(counts[code]) for code in top}
+        return facets
+
+    def can_sort(self, keys: Sequence[SortKey]) -> bool:
+        return all(name in SNAPSHOT_SORT_KEYS for name, _, _ in keys)
+
+    def _sort_key(self, name: str, descending: bool):
+        # Ascending float keys in which NULL sorts first, as order_by_keys lays it out
+        n = self.size
+        if name == "id":
+            key = self.ids[:n].astype(np.float64)
+        elif name in self.numeric:
+            values = self.numeric[name][:n]
+            key = np.where(np.isnan(values), -np.inf, values)
+        else:
+            codes = self.encoded[name][:n]
+            key = np.where(codes >= 0, self.dictionaries[name].ranks()[np.maximum(codes, 0)], -np.inf)
+        return -key if descending else key
+
+    def _cursor_key(self, name: str, value, descending: bool) -> float:
+        if value is None:
+            key = -math.inf
+        elif name in self.dictionaries:
+            key = self.dictionaries[name].rank(value)
+        else:
+            key = float(value)
+        return -key if descending else key
+
+    def page_ids(self, keys: Sequence[SortKey], values: Optional[Sequence], limit: int, selected=None) -> List[int]:
+        """Ids of the first `limit` selected rows after `values` in the order of `keys`."""
+        selected = self.alive[:self.size].copy() if selected is None else selected.copy()
+        sort_keys = [self._sort_key(name, descending) for name, _, descending in keys]
+
+        if values is not None:
+            after = np.zeros(self.size, dtype=bool)
+            tied = np.ones(self.size, dtype=bool)
+            for key, (name, _, descending), value in zip(sort_keys, keys, values):
+                bound = self._cursor_key(name, value, descending)
+                after |= tied & (key > bound)
+                tied &= key == bound
+            selected &= after
+
+        rows = np.flatnonzero(selected)
+        if len(rows) > limit:
+            # The first `limit` rows all have a first key no larger than the
+            # limit-th smallest, so only those need the full lexsort
+            first = sort_keys[0][rows]
+            rows = rows[first <= np.partition(first, limit - 1)[limit - 1]]
+        order = np.lexsort([key[rows] for key in reversed(sort_keys)])[:limit]
+        return self.ids[rows[order]].tolist()
+
+
+class SnapshotDelta:
+    def __init__(self, generation: int, changes: int, product_ids: Sequence[int], rows: list):
+        self.generation = generation
+        self.changes = changes
+        self.product_ids = product_ids
+        self.rows = rows
+
+
+class ProductSnapshotStore:
+    """Holds the current ProductSnapshot and keeps it in step with the database.
+
+    The snapshot records the catalog_state generation it reflects. Readers get
+    it only while that generation is current, and rebuild it otherwise. Writes
+    read their own rows and the generation inside their transaction and apply
+    them after the commit, so the snapshot follows this process's writes without
+    a reload; writes from anywhere else show up as a generation gap.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled and np is not None
+        self.snapshot: Optional[ProductSnapshot] = None
+        self.loads = 0
+        self.applied = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> Optional[ProductSnapshot]:
+        """The snapshot as of the current catalog, or None to use the database."""
+        if not self.enabled:
+            return None
+        state = await read_catalog_state(db)
+        if state is None:
+            return None
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.generation == state.generation:
+            return snapshot
+
+        async with self._lock:
+            snapshot = self.snapshot
+            if snapshot is None or snapshot.generation != state.generation:
+                snapshot = await self._load(db)
+        return snapshot
+
+    async def _load(self, db: AsyncSession) -> ProductSnapshot:
+        state = await read_catalog_state(db)
+        rows = (await db.execute(select(*SNAPSHOT_COLUMNS).order_by(Product.id))).all()
+        snapshot = ProductSnapshot(state.generation, capacity=max(1024, len(rows) * 2))
+        for row in rows:
+            snapshot.upsert(row)
+        self.snapshot = snapshot
+        self.loads += 1
+        return snapshot
+
+    async def read_delta(self, db: AsyncSession, product_ids: Sequence[int], changes: int) -> Optional[SnapshotDelta]:
+        """Capture written rows before the commit. `changes` is the number of rows written."""
+        if not self.enabled or self.snapshot is None:
+            return None
+        state = await read_catalog_state(db)
+        if state is None:
+            return None
+        rows = (await db.execute(select(*SNAPSHOT_COLUMNS).where(Product.id.in_(product_ids)))).all()
+        return SnapshotDelta(state.generation, changes, product_ids, rows)
+
+    def apply(self, delta: Optional[SnapshotDelta]):
+        """Apply a committed delta, or drop the snapshot if it missed other writes."""
+        snapshot = self.snapshot
+        if delta is None or snapshot is None:
+            return
+        if snapshot.generation != delta.generation - delta.changes:
+            if snapshot.generation < delta.generation:
+                self.snapshot = None
+            return
+
+        found = {row.id for row in delta.rows}
+        for row in delta.rows:
+            snapshot.upsert(row)
+        for product_id in delta.product_ids:
+            if product_id not in found:
+                snapshot.remove(product_id)
+        snapshot.generation = delta.generation
+        self.applied += 1
+
+
+async def paginate_snapshot(db: AsyncSession, snapshot: ProductSnapshot, stmt, keys: Sequence[SortKey],
+                            cursor: Optional[str], page_size: int, selected=None):
+    """paginate() with the page's ids picked from the snapshot.
+
+    Only the page itself is read from the database, by primary key. Rows are
+    returned like paginate(scalars=False) and the cursors are interchangeable.
+    """
+    if page_size < 1 or page_size > MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+    names = [name for name, _, _ in keys]
+    values = None if cursor is None else decode_cursor(cursor, names)
+    ids = snapshot.page_ids(keys, values, page_size + 1, selected)
+
+    by_id = {row.id: row for row in await db.execute(stmt.where(Product.id.in_(ids)))}
+    rows = [by_id[product_id] for product_id in ids if product_id in by_id]
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(names, [getattr(rows[-1], name) for name in names])
+    return rows, next_cursor
+
+
+product_snapshot = ProductSnapshotStore(PRODUCT_SNAPSHOT)
@@ -0,0 +1,49 @@
+# app/api/products/sorting.py
+
+from typing import List
+from app.api.products.pagination import SortKey
+from app.database.models.products import Product
+
+# Allow-list for ?sort=. Every column has an index that ends in id (SQLite
+# appends the rowid to single-column indexes), so the first sort key plus the
+# id tie-break is an index range scan rather than a sort of the whole table.
+SORTABLE_COLUMNS = {
+    "id": Product.id,
+    "title": Product.title,
+    "price": Product.price,
+    "category": Product.category,
+    "rating_rate": Product.rating_rate,
+    "discountPercentage": Product.discountPercentage,
+    "stockQuantity": Product.stockQuantity,
+}
+
+MAX_SORT_KEYS = 3
+
+
+def parse_sort(value: str) -> List[SortKey]:
+    """Sort keys for a ?sort= value such as "-rating_rate,price".
+
+    A leading "-" sorts that key descending. id is appended as the final key,
+    in the direction of the first key, so every row has one stable position.
+    """
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names:
+        raise ValueError("sort must name at least one field")
+    if len(names) > MAX_SORT_KEYS:
+        raise ValueError(f"At most {MAX_SORT_KEYS} sort keys")
+
+    keys = []
+    for name in names:
+        descending = name.startswith("-")
+        if descending:
+            name = name[1:]
+        if name not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {name}. Allowed: {', '.join(SORTABLE_COLUMNS)}")
+        if any(key[0] == name for key in keys):
+            raise ValueError(f"Duplicate sort key: {name}")
+        keys.append((name, SORTABLE_COLUMNS[name], descending))
+        if name == "id":
+            # id is unique, keys after it could never break a tie
+            return keys
+
+    return keys + [("id", Product.id, keys[0][2])]
@@ -0,0 +1,228 @@
+# app/api/products/stats.py
+
+import math
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.products.filters import FACET_COLUMNS, filter_conditions
+from app.api.products.snapshot import np
+from app.database.models.products import Product
+from app.schemas.product import HistogramBucket, ProductFilters, ProductStats, StatsGroup
+
+# Numeric columns that can be averaged, bucketed and ranked
+STATS_METRICS = {
+    "price": Product.price,
+    "rating_rate": Product.rating_rate,
+    "discountPercentage": Product.discountPercentage,
+    "stockQuantity": Product.stockQuantity,
+}
+
+MAX_GROUP_BY = 2
+MAX_BUCKETS = 50
+DEFAULT_BUCKETS = {
+    "price": (10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0),
+    "rating_rate": (1.0, 2.0, 3.0, 4.0, 5.0),
+    "discountPercentage": (5.0, 10.0, 20.0, 30.0, 50.0),
+    "stockQuantity": (1.0, 10.0, 50.0, 100.0),
+}
+DEFAULT_PERCENTILES = (25.0, 50.0, 75.0, 90.0, 99.0)
+
+
+class StatsQuery(NamedTuple):
+    group_by: Tuple[str, ...]
+    histograms: Tuple[Tuple[str, Tuple[float, ...]], ...]  # (metric, bucket boundaries)
+    percentiles: Tuple[Tuple[str, Tuple[float, ...]], ...]  # (metric, percentiles 0-100)
+
+
+def _numbers(value: str, what: str) -> Tuple[float, ...]:
+    try:
+        numbers = tuple(float(part) for part in value.split(",") if part.strip())
+    except ValueError:
+        raise ValueError(f"{what} must be comma-separated numbers")
+    if not numbers or any(math.isnan(number) or math.isinf(number) for number in numbers):
+        raise ValueError(f"{what} must be comma-separated numbers")
+    return numbers
+
+
+def _metric_specs(values: Optional[List[str]], defaults, what: str) -> Tuple[Tuple[str, Tuple[float, ...]], ...]:
+    # Each value is "metric" or "metric:n1,n2,..."
+    specs = {}
+    for value in values or []:
+        metric, _, numbers = value.partition(":")
+        metric = metric.strip()
+        if metric not in STATS_METRICS:
+            raise ValueError(f"Cannot compute {what} of {metric}. Allowed: {', '.join(STATS_METRICS)}")
+        specs[metric] = _numbers(numbers, what) if numbers.strip() else defaults(metric)
+    return tuple(specs.items())
+
+
+def parse_stats_query(group_by: Optional[str], histograms: Optional[List[str]], percentiles: Optional[List[str]]) -> StatsQuery:
+    """Validate the /stats parameters, e.g. group_by=category,brand, histogram=price:0,50,100, percentiles=rating_rate:50,90."""
+    dimensions = tuple(dict.fromkeys(name.strip() for name in (group_by or "").split(",") if name.strip()))
+    unknown = [name for name in dimensions if name not in FACET_COLUMNS]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}. Allowed: {', '.join(FACET_COLUMNS)}")
+    if len(dimensions) > MAX_GROUP_BY:
+        raise ValueError(f"At most {MAX_GROUP_BY} group-by dimensions")
+
+    histogram_specs = _metric_specs(histograms, DEFAULT_BUCKETS.get, "histogram buckets")
+    for metric, boundaries in histogram_specs:
+        if list(boundaries) != sorted(set(boundaries)):
+            raise ValueError(f"Bucket boundaries for {metric} must be strictly increasing")
+        if len(boundaries) > MAX_BUCKETS:
+            raise ValueError(f"At most {MAX_BUCKETS} bucket boundaries")
+
+    percentile_specs = _metric_specs(percentiles, lambda metric: DEFAULT_PERCENTILES, "percentiles")
+    for metric, ranks in percentile_specs:
+        if any(rank < 0 or rank > 100 for rank in ranks):
+            raise ValueError("Percentiles must be between 0 and 100")
+    return StatsQuery(dimensions, histogram_specs, percentile_specs)
+
+
+def stats_key(query: StatsQuery, filters: ProductFilters) -> tuple:
+    """Cache key for one query shape; every product write drops the ("stats",) family."""
+    filter_items = tuple(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in filters.model_dump().items() if value is not None
+    )
+    return ("stats", query, filter_items)
+
+
+def nearest_rank(count: int, percentile: float) -> int:
+    # Index of the percentile in the sorted values, by the nearest-rank method
+    return max(math.ceil(percentile / 100 * count), 1) - 1
+
+
+def percentile_label(percentile: float) -> str:
+    return f"p{percentile:g}"
+
+
+def bucket_bounds(boundaries: Sequence[float]) -> List[Tuple[Optional[float], Optional[float]]]:
+    # len(boundaries) + 1 buckets: below the first boundary, between each pair, and from the last one up
+    edges = [None, *boundaries, None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+async def sql_stats(db: AsyncSession, query: StatsQuery, filters: ProductFilters) -> ProductStats:
+    """Aggregate in the database; no product rows are fetched."""
+    conditions = filter_conditions(filters)
+    averages = [func.avg(column).label(name) for name, column in STATS_METRICS.items()]
+
+    overall = (await db.execute(select(func.count().label("count"), *averages).where(*conditions))).one()
+    stats = ProductStats(
+        count=overall.count,
+        averages={name: getattr(overall, name) for name in STATS_METRICS},
+    )
+
+    if query.group_by:
+        dimensions = [FACET_COLUMNS[name].label(name) for name in query.group_by]
+        rows = await db.execute(
+            select(*dimensions, func.count().label("count"), *averages)
+            .where(*conditions)
+            .group_by(*dimensions)
+            .order_by(*dimensions)
+        )
+        stats.groups = [
+            StatsGroup(
+                key={name: getattr(row, name) for name in query.group_by},
+                count=row.count,
+                averages={name: getattr(row, name) for name in STATS_METRICS},
+            )
+            for row in rows
+        ]
+
+    if query.histograms:
+        stats.histograms = {}
+        for metric, boundaries in query.histograms:
+            column = STATS_METRICS[metric]
+            bucket = case(
+                *[(column < boundary, index) for index, boundary in enumerate(boundaries)],
+                else_=len(boundaries),
+            ).label("bucket")
+            counts = dict((await db.execute(
+                select(bucket, func.count()).where(column.isnot(None), *conditions).group_by(bucket)
+            )).all())
+            stats.histograms[metric] = [
+                HistogramBucket(lower=lower, upper=upper, count=counts.get(index, 0))
+                for index, (lower, upper) in enumerate(bucket_bounds(boundaries))
+            ]
+
+    if query.percentiles:
+        stats.percentiles = {}
+        for metric, ranks in query.percentiles:
+            column = STATS_METRICS[metric]
+            present = [column.isnot(None), *conditions]
+            count = await db.scalar(select(func.count()).where(*present))
+            values = {}
+            for rank in ranks:
+                # Walks the metric's index up to the rank; no rows reach Python
+                values[percentile_label(rank)] = await db.scalar(
+                    select(column).where(*present).order_by(column).offset(nearest_rank(count, rank)).limit(1)
+                ) if count else None
+            stats.percentiles[metric] = values
+    return stats
+
+
+def _means(values, valid, groups=None, group_count: int = 1) -> list:
+    # Mean of the non-NaN values of each group, None for a group with none
+    groups = np.zeros(len(values), dtype=np.intp) if groups is None else groups
+    sums = np.bincount(groups[valid], weights=values[valid], minlength=group_count)
+    counts = np.bincount(groups[valid], minlength=group_count)
+    return [float(total / count) if count else None for total, count in zip(sums, counts)]
+
+
+def snapshot_stats(snapshot, query: StatsQuery, filters: ProductFilters) -> ProductStats:
+    """sql_stats computed with vectorized operations on a ProductSnapshot."""
+    selected = snapshot.mask(filters)
+    metrics = {name: snapshot.numeric[name][:snapshot.size][selected] for name in STATS_METRICS}
+    valid = {name: ~np.isnan(values) for name, values in metrics.items()}
+
+    stats = ProductStats(
+        count=int(selected.sum()),
+        averages={name: _means(values, valid[name])[0] for name, values in metrics.items()},
+    )
+
+    if query.group_by:
+        # One integer key per combination of dictionary codes; NULL is code -1
+        combined = np.zeros(int(selected.sum()), dtype=np.int64)
+        for name in query.group_by:
+            codes = snapshot.encoded[name][:snapshot.size][selected].astype(np.int64) + 1
+            combined = combined * (len(snapshot.dictionaries[name].values) + 1) + codes
+        keys, groups = np.unique(combined, return_inverse=True)
+        counts = np.bincount(groups, minlength=len(keys))
+        averages = {name: _means(values, valid[name], groups, len(keys)) for name, values in metrics.items()}
+
+        stats.groups = []
+        for index, combined_key in enumerate(keys.tolist()):
+            key = {}
+            for name in reversed(query.group_by):
+                dictionary = snapshot.dictionaries[name]
+                combined_key, code = divmod(combined_key, len(dictionary.values) + 1)
+                key[name] = dictionary.values[code - 1] if code else None
+            stats.groups.append(StatsGroup(
+                key={name: key[name] for name in query.group_by},
+                count=int(counts[index]),
+                averages={name: averages[name][index] for name in STATS_METRICS},
+            ))
+        # Same order as the database: by each dimension, NULL first
+        stats.groups.sort(key=lambda group: [(value is not None, value or "") for value in group.key.values()])
+
+    if query.histograms:
+        stats.histograms = {}
+        for metric, boundaries in query.histograms:
+            values = metrics[metric][valid[metric]]
+            counts = np.bincount(np.searchsorted(boundaries, values, side="right"), minlength=len(boundaries) + 1)
+            stats.histograms[metric] = [
+                HistogramBucket(lower=lower, upper=upper, count=int(counts[index]))
+                for index, (lower, upper) in enumerate(bucket_bounds(boundaries))
+            ]
+
+    if query.percentiles:
+        stats.percentiles = {}
+        for metric, ranks in query.percentiles:
+            values = np.sort(metrics[metric][valid[metric]])
+            stats.percentiles[metric] = {
+                percentile_label(rank): float(values[nearest_rank(len(values), rank)]) if len(values) else None
+                for rank in ranks
+            }
+    return stats
@@ -0,0 +1,92 @@
+# app/core/blob_store.py
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv("env/.env")
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "./media/blobs")
+
+_REF_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+class BlobStore:
+    """Content-addressed files on local disk.
+
+    A blob's reference is the SHA-256 of its bytes, so identical uploads share
+    one file and a stored blob never changes.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, ref: str) -> str:
+        if not _REF_PATTERN.match(ref):
+            raise ValueError("Invalid blob reference")
+        return os.path.join(self.root, ref[:2], ref)
+
+    def exists(self, ref: str) -> bool:
+        try:
+            return os.path.isfile(self.path(ref))
+        except ValueError:
+            return False
+
+    def put(self, data: bytes) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        path = self.path(ref)
+        if os.path.exists(path):
+            return ref
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return ref
+
+
+def decode_image(value: str) -> bytes:
+    # Accept both bare base64 and data URLs ("data:image/png;base64,...")
+    if value.startswith("data:"):
+        value = value.partition(",")[2]
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("Image must be base64 encoded")
+
+
+def image_content_type(path: str) -> str:
+    with open(path, "rb") as blob:
+        head = blob.read(12)
+    for signature, content_type in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+blob_store = BlobStore(BLOB_STORE_DIR)
+
+
+def store_image(value: str) -> str:
+    return blob_store.put(decode_image(value))
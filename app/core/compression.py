@@ -0,0 +1,252 @@
+# app/core/compression.py
+
+import os
+import zlib
+from typing import Dict, Optional, Sequence
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import ResponseCache
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+load_dotenv("env/.env")
+
+# Bodies smaller than this go out as they are; compressing them saves less than the header costs
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/xml", "text/")
+
+# Compressed bodies keyed by the response's ETag, so a hot response is
+# compressed once per encoding. Set COMPRESSION_CACHE_MAX_ENTRIES=0 to disable.
+compressed_cache = ResponseCache(
+    max_entries=int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", 2000)),
+    max_bytes=int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl=float(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", 300)),
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self) -> "GzipStream":
+        return GzipStream()
+
+
+class GzipStream:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Sync flush so each chunk reaches the client as soon as it is written
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+
+    def stream(self) -> "BrotliStream":
+        return BrotliStream()
+
+
+class BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self):
+        # A ZstdCompressor keeps its context between calls. One-shot compress()
+        # calls never overlap on the event loop thread, so they share it.
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def stream(self) -> "ZstdStream":
+        return ZstdStream()
+
+
+class ZstdStream:
+    def __init__(self):
+        # Streams interleave across awaits, and a compressobj writes through its
+        # ZstdCompressor's context, so every stream needs a compressor of its own
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encoders() -> list:
+    """Encoders in order of preference; brotli and zstd only when installed."""
+    encoders = []
+    if zstandard is not None:
+        encoders.append(ZstdEncoder())
+    if brotli is not None:
+        encoders.append(BrotliEncoder())
+    encoders.append(GzipEncoder())
+    return encoders
+
+
+def negotiate(accept_encoding: str, names: Sequence[str]) -> Optional[str]:
+    """Pick the encoding from `names` with the highest q-value; ties go to the earlier name."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name, params = name.strip().lower(), params.strip().lower()
+        if not name:
+            continue
+        try:
+            weights[name] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weights[name] = 0.0
+
+    best, best_weight = None, 0.0
+    for name in names:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+def _is_compressible(headers: MutableHeaders) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts.
+
+    Small bodies, already-encoded responses and non-text content types are left
+    alone. Streaming responses are compressed chunk by chunk. Whole bodies
+    that carry a strong ETag are cached compressed in `cache`.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+                 cache: Optional[ResponseCache] = compressed_cache):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.encoders = {encoder.name: encoder for encoder in available_encoders()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name = negotiate(Headers(scope=scope).get("accept-encoding", ""), list(self.encoders))
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, self.encoders[name], send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoder, send: Send):
+        self.middleware = middleware
+        self.encoder = encoder
+        self._send = send
+        self.start: Optional[Message] = None
+        self.stream = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if self.passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress
+            self.start = message
+        elif self.stream is not None:
+            await self._send_chunk(message)
+        elif message["type"] == "http.response.body":
+            await self._first_body(message)
+        else:
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+
+    async def _first_body(self, message: Message):
+        headers = MutableHeaders(raw=self.start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        compressible = self.start["status"] not in (204, 304) and _is_compressible(headers)
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        if not compressible or (not more_body and len(body) < self.middleware.minimum_size):
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoder.name
+        etag = headers.get("etag")
+        if etag is not None:
+            # The encoded bytes differ from the identity representation
+            headers["ETag"] = etag if etag.startswith("W/") else f"W/{etag}"
+
+        if more_body:
+            del headers["Content-Length"]
+            self.stream = self.encoder.stream()
+            await self._send(self.start)
+            await self._send_chunk(message)
+            return
+
+        data = self._compress(body, etag)
+        headers["Content-Length"] = str(len(data))
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": data})
+
+    def _compress(self, body: bytes, etag: Optional[str]) -> bytes:
+        cache = self.middleware.cache
+        if cache is None or etag is None or etag.startswith("W/"):
+            return self.encoder.compress(body)
+
+        key = ("compressed", etag, self.encoder.name, len(body))
+        data = cache.get(key)
+        if data is None:
+            data = self.encoder.compress(body)
+            cache.set(key, data)
+        return data
+
+    async def _send_chunk(self, message: Message):
+        more_body = message.get("more_body", False)
+        data = self.stream.chunk(message.get("body", b""))
+        if not more_body:
+            data += self.stream.finish()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
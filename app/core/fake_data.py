@@ -0,0 +1,381 @@
+# app/core/fake_data.py
+
+import math
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import List, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install numpy
+    np = None
+
+# Every value of record k is a hash of (seed, k, field), so any record can be
+# produced on its own, in any order and in any process, and always comes out
+# the same for the same seed.
+
+MASK64 = (1 << 64) - 1
+
+# Hash streams, one per random draw of a record
+(_CATEGORY, _BRAND, _COLOR, _ADJECTIVE, _NOUN, _MODEL, _PRICE_A, _PRICE_B, _DISCOUNT, _DISCOUNT_SIZE,
+ _STOCK, _STOCK_SIZE, _RATING_A, _RATING_B, _RATING_COUNT, _SENTENCE, _FIRST_NAME, _LAST_NAME,
+ _ROLE, _ACTIVE, _USER, _EVENT, _TIME, _OTP_CODE, _OTP_ACTIVE, _STATUS, _LINES) = range(27)
+MAX_ORDER_LINES = 5
+_LINE_PRODUCT = 100  # + line number
+_LINE_QUANTITY = 110  # + line number
+
+_KIND_SALT = {"product": 0x5052, "user": 0x5553, "user_log": 0x4C4F, "otp": 0x4F54, "order": 0x4F52}
+
+CATEGORIES = [
+    ("smartphones", ("Phone", "Smartphone")),
+    ("laptops", ("Laptop", "Notebook", "Ultrabook")),
+    ("headphones", ("Headphones", "Earbuds", "Headset")),
+    ("fragrances", ("Eau de Parfum", "Cologne", "Body Mist")),
+    ("skincare", ("Serum", "Moisturizer", "Cleanser")),
+    ("groceries", ("Coffee Beans", "Olive Oil", "Granola")),
+    ("home-decoration", ("Vase", "Wall Clock", "Table Lamp")),
+    ("furniture", ("Armchair", "Bookshelf", "Desk")),
+    ("tops", ("T-Shirt", "Blouse", "Hoodie")),
+    ("womens-dresses", ("Dress", "Maxi Dress", "Wrap Dress")),
+    ("womens-shoes", ("Heels", "Sneakers", "Flats")),
+    ("mens-shirts", ("Shirt", "Polo", "Oxford Shirt")),
+    ("mens-shoes", ("Loafers", "Boots", "Running Shoes")),
+    ("mens-watches", ("Watch", "Chronograph", "Dive Watch")),
+    ("womens-watches", ("Watch", "Smartwatch", "Bracelet Watch")),
+    ("womens-bags", ("Tote", "Backpack", "Clutch")),
+    ("womens-jewellery", ("Necklace", "Ring", "Earrings")),
+    ("sunglasses", ("Sunglasses", "Aviators")),
+    ("automotive", ("Dash Cam", "Car Charger", "Seat Cover")),
+    ("motorcycle", ("Helmet", "Riding Gloves")),
+    ("lighting", ("LED Strip", "Desk Lamp", "Floor Lamp")),
+    ("tablets", ("Tablet", "E-Reader")),
+    ("kitchen-accessories", ("Knife Set", "Blender", "Kettle")),
+    ("sports-accessories", ("Yoga Mat", "Dumbbells", "Water Bottle")),
+]
+BRANDS = [
+    "Apple", "Samsung", "Sony", "Dell", "Lenovo", "Asus", "Bose", "Nike", "Adidas", "Puma",
+    "Ikea", "Philips", "Casio", "Fossil", "Rolex", "Gucci", "Prada", "Zara", "Uniqlo", "Levi's",
+    "Nivea", "L'Oreal", "Dior", "Chanel", "Nestle", "Kellogg's", "Bosch", "Braun", "Xiaomi", "Huawei",
+    "Garmin", "Canon", "Nikon", "Logitech", "Anker", "JBL", "Ray-Ban", "Oakley", "Honda", "Yamaha",
+]
+COLORS = ["black", "white", "silver", "gray", "red", "blue", "green", "gold", "rose", "navy", "beige", "brown"]
+ADJECTIVES = ["Classic", "Premium", "Compact", "Pro", "Ultra", "Essential", "Deluxe", "Smart", "Eco", "Vintage", "Sport", "Lite"]
+SENTENCES = [
+    "Built to last with carefully selected materials.",
+    "A customer favourite for everyday use.",
+    "Lightweight, durable and easy to care for.",
+    "Designed for comfort from morning to night.",
+    "Backed by a two-year manufacturer warranty.",
+    "Ships in recyclable packaging.",
+]
+FIRST_NAMES = [
+    "Sokha", "Dara", "Vanna", "Sophea", "Liam", "Olivia", "Noah", "Emma", "Mateo", "Sofia",
+    "Yuki", "Haruto", "Aarav", "Diya", "Chen", "Mei", "Lucas", "Amara", "Omar", "Leila",
+]
+LAST_NAMES = [
+    "Keang", "Chan", "Sok", "Lim", "Smith", "Garcia", "Nguyen", "Kim", "Tanaka", "Patel",
+    "Muller", "Rossi", "Silva", "Okafor", "Haddad", "Novak", "Jensen", "Cohen", "Ivanova", "Lopez",
+]
+LOG_EVENTS = ["login", "logout", "token_refresh", "password_reset", "email_change", "otp_verified"]
+ORDER_STATUSES = ["pending", "paid", "shipped", "delivered", "cancelled", "refunded"]
+
+# Timestamps fall in the year after this, so a seed gives the same dates whenever it runs
+EPOCH = datetime(2024, 1, 1)
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class FakeDataConfig(NamedTuple):
+    category_skew: float = 1.1  # Zipf exponent; 0 spreads products evenly over categories
+    price_median: float = 40.0  # Prices are log-normal around this median
+    price_sigma: float = 0.9
+    rating_mean: float = 4.0  # Ratings are normal, clipped to 1-5
+    rating_sd: float = 0.6
+    discount_share: float = 0.4  # Share of products on discount
+    out_of_stock_share: float = 0.08
+
+
+def mix64(x):
+    """splitmix64 finalizer; a well-mixed 64-bit hash of a 64-bit integer.
+
+    Works unchanged on numpy uint64 arrays, which wrap where ints are masked,
+    so the vectorized generators below draw exactly the same numbers.
+    """
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def record_key(seed: int, kind: str, k: int) -> int:
+    # Distinct kinds never share keys, so product 5 and user 5 draw independently
+    return mix64(mix64((seed & MASK64) ^ _KIND_SALT[kind]) ^ k)
+
+
+def unit(key: int, stream: int) -> float:
+    """Uniform float in [0, 1) for one draw of a record."""
+    return (mix64(key ^ (stream * 0x9E3779B97F4A7C15 & MASK64)) >> 11) * (1.0 / (1 << 53))
+
+
+def normal(key: int, stream_a: int, stream_b: int) -> float:
+    # Box-Muller from two draws
+    return math.sqrt(-2.0 * math.log(1.0 - unit(key, stream_a))) * math.cos(2.0 * math.pi * unit(key, stream_b))
+
+
+def pick(items, u: float):
+    return items[min(int(u * len(items)), len(items) - 1)]
+
+
+_weight_cache = {}
+
+
+def category_cumulative(skew: float) -> list:
+    """Cumulative Zipf weights over CATEGORIES, normalized to end at 1."""
+    cumulative = _weight_cache.get(skew)
+    if cumulative is None:
+        weights = list(accumulate(1.0 / (rank + 1) ** skew for rank in range(len(CATEGORIES))))
+        cumulative = _weight_cache[skew] = [weight / weights[-1] for weight in weights]
+    return cumulative
+
+
+def product_price(key: int, config: FakeDataConfig) -> float:
+    return max(round(math.exp(math.log(config.price_median) + config.price_sigma * normal(key, _PRICE_A, _PRICE_B)), 2), 0.01)
+
+
+def stock_status(stock: int) -> str:
+    if stock <= 0:
+        return "Out of Stock"
+    return "Low Stock" if stock < 10 else "In Stock"
+
+
+def fake_product(seed: int, k: int, config: FakeDataConfig = FakeDataConfig()) -> dict:
+    """Column values of product k, in the shape Product rows are inserted with."""
+    key = record_key(seed, "product", k)
+    category, nouns = CATEGORIES[min(bisect_right(category_cumulative(config.category_skew), unit(key, _CATEGORY)), len(CATEGORIES) - 1)]
+    brand = pick(BRANDS, unit(key, _BRAND))
+    color = pick(COLORS, unit(key, _COLOR))
+    noun = pick(nouns, unit(key, _NOUN))
+    adjective = pick(ADJECTIVES, unit(key, _ADJECTIVE))
+    model = f"{brand[0].upper()}{int(unit(key, _MODEL) * 9000) + 1000}"
+
+    price = product_price(key, config)
+    discount = round(unit(key, _DISCOUNT_SIZE) * 30, 2) if unit(key, _DISCOUNT) < config.discount_share else 0.0
+    if unit(key, _STOCK) < config.out_of_stock_share:
+        stock = 0
+    else:
+        stock = 1 + int(-math.log(1.0 - unit(key, _STOCK_SIZE)) * 50)
+    rating = round(min(max(config.rating_mean + config.rating_sd * normal(key, _RATING_A, _RATING_B), 1.0), 5.0), 1)
+
+    return {
+        "title": f"{brand} {adjective} {noun}",
+        "price": price,
+        "description": f"{adjective} {noun.lower()} by {brand} in {color}. {pick(SENTENCES, unit(key, _SENTENCE))}",
+        "brand": brand,
+        "model": model,
+        "color": color,
+        "category": category,
+        "discountPercentage": discount,
+        "stockQuantity": stock,
+        "rating_rate": rating,
+        "rating_count": int(math.exp(unit(key, _RATING_COUNT) * 8)),
+        "availabilityStatus": stock_status(stock),
+    }
+
+
+def fake_user_name(seed: int, k: int):
+    key = record_key(seed, "user", k)
+    return pick(FIRST_NAMES, unit(key, _FIRST_NAME)), pick(LAST_NAMES, unit(key, _LAST_NAME))
+
+
+def fake_user_email(seed: int, k: int) -> str:
+    # k and the seed keep emails unique across a dataset and across seeds
+    first, last = fake_user_name(seed, k)
+    return f"{first}.{last}.{seed}-{k}@example.com".lower()
+
+
+def fake_user(seed: int, k: int, hashed_password: str) -> dict:
+    """User k. Hashing a password per row would dominate, so all share one hash."""
+    key = record_key(seed, "user", k)
+    first, last = fake_user_name(seed, k)
+    return {
+        "full_name": f"{first} {last}",
+        "email": fake_user_email(seed, k),
+        "hashed_password": hashed_password,
+        "is_active": unit(key, _ACTIVE) < 0.9,
+        "role": "admin" if unit(key, _ROLE) < 0.02 else "user",
+    }
+
+
+def fake_timestamp(key: int) -> datetime:
+    return EPOCH + timedelta(seconds=int(unit(key, _TIME) * SECONDS_PER_YEAR))
+
+
+def fake_user_log(seed: int, k: int, users: int) -> dict:
+    """Log entry k for one of users 0..users-1; user_id is that index."""
+    key = record_key(seed, "user_log", k)
+    return {
+        "user_id": min(int(unit(key, _USER) * users), users - 1),
+        "event": pick(LOG_EVENTS, unit(key, _EVENT)),
+        "timestamp": fake_timestamp(key),
+    }
+
+
+def fake_otp(seed: int, k: int, users: int) -> dict:
+    key = record_key(seed, "otp", k)
+    requested = fake_timestamp(key)
+    return {
+        "email": fake_user_email(seed, min(int(unit(key, _USER) * users), users - 1)),
+        "otp_code": 100000 + int(unit(key, _OTP_CODE) * 900000),
+        "request_time": requested,
+        "expires_at": requested + timedelta(minutes=1),
+        "active": unit(key, _OTP_ACTIVE) < 0.1,
+    }
+
+
+def fake_order(seed: int, k: int, products: int, users: int, config: FakeDataConfig = FakeDataConfig()) -> dict:
+    """Order k of one of users 0..users-1, with lines for products 0..products-1.
+
+    Line prices are those products' own prices, so orders agree with the
+    products generated from the same seed.
+    """
+    key = record_key(seed, "order", k)
+    lines = []
+    for line in range(1 + min(int(unit(key, _LINES) * MAX_ORDER_LINES), MAX_ORDER_LINES - 1)):
+        product = min(int(unit(key, _LINE_PRODUCT + line) * products), products - 1)
+        lines.append((product, 1 + int(unit(key, _LINE_QUANTITY + line) * 3)))
+    prices = [product_price(record_key(seed, "product", product), config) for product, _ in lines]
+    return order_record(
+        k, min(int(unit(key, _USER) * users), users - 1), pick(ORDER_STATUSES, unit(key, _STATUS)),
+        lines, prices, fake_timestamp(key).isoformat(),
+    )
+
+
+def order_record(k: int, user: int, status: str, lines, prices, created_at: str) -> dict:
+    items = [
+        {"product_id": product + 1, "quantity": quantity, "unit_price": price}
+        for (product, quantity), price in zip(lines, prices)
+    ]
+    return {
+        "id": k + 1,
+        "user_id": user + 1,
+        "status": status,
+        "items": items,
+        "total": round(sum(item["unit_price"] * item["quantity"] for item in items), 2),
+        "created_at": created_at,
+    }
+
+
+# Vectorized generators: the same records as the functions above for a whole
+# range of k at once. Every draw is computed as a numpy array; only the final
+# rounding and string formatting happen per record.
+
+def _indexes(u, count: int):
+    return np.minimum((u * count).astype(np.int64), count - 1)
+
+
+def _normals(key, stream_a: int, stream_b: int):
+    return np.sqrt(-2.0 * np.log(1.0 - unit(key, stream_a))) * np.cos(2.0 * np.pi * unit(key, stream_b))
+
+
+def _keys(seed: int, kind: str, ks):
+    return record_key(seed, kind, np.asarray(ks, dtype=np.uint64))
+
+
+def _prices(key, config: FakeDataConfig) -> List[float]:
+    raw = np.exp(math.log(config.price_median) + config.price_sigma * _normals(key, _PRICE_A, _PRICE_B))
+    return [max(round(price, 2), 0.01) for price in raw.tolist()]
+
+
+def _timestamps(key) -> List[str]:
+    seconds = (unit(key, _TIME) * SECONDS_PER_YEAR).astype(np.int64)
+    return (np.datetime64(EPOCH, "s") + seconds).astype(str).tolist()
+
+
+def product_block(seed: int, start: int, stop: int, config: FakeDataConfig = FakeDataConfig()) -> List[dict]:
+    """fake_product for start <= k < stop."""
+    key = _keys(seed, "product", np.arange(start, stop))
+    categories = np.minimum(
+        np.searchsorted(category_cumulative(config.category_skew), unit(key, _CATEGORY), side="right"),
+        len(CATEGORIES) - 1,
+    )
+    noun_counts = np.array([len(nouns) for _, nouns in CATEGORIES])[categories]
+    nouns = np.minimum((unit(key, _NOUN) * noun_counts).astype(np.int64), noun_counts - 1)
+    stock = np.where(
+        unit(key, _STOCK) < config.out_of_stock_share,
+        0,
+        1 + (-np.log(1.0 - unit(key, _STOCK_SIZE)) * 50).astype(np.int64),
+    )
+    discount_sizes = unit(key, _DISCOUNT_SIZE) * 30
+    discounted = unit(key, _DISCOUNT) < config.discount_share
+    ratings = np.clip(config.rating_mean + config.rating_sd * _normals(key, _RATING_A, _RATING_B), 1.0, 5.0)
+
+    columns = zip(
+        categories.tolist(), nouns.tolist(), _indexes(unit(key, _BRAND), len(BRANDS)).tolist(),
+        _indexes(unit(key, _COLOR), len(COLORS)).tolist(), _indexes(unit(key, _ADJECTIVE), len(ADJECTIVES)).tolist(),
+        ((unit(key, _MODEL) * 9000).astype(np.int64) + 1000).tolist(), _prices(key, config),
+        discounted.tolist(), discount_sizes.tolist(), stock.tolist(), ratings.tolist(),
+        np.exp(unit(key, _RATING_COUNT) * 8).astype(np.int64).tolist(),
+        _indexes(unit(key, _SENTENCE), len(SENTENCES)).tolist(),
+    )
+    products = []
+    for category, noun, brand, color, adjective, model, price, on_discount, discount, stock_count, rating, rating_count, sentence in columns:
+        category, nouns_of_category = CATEGORIES[category]
+        noun, brand, color, adjective = nouns_of_category[noun], BRANDS[brand], COLORS[color], ADJECTIVES[adjective]
+        products.append({
+            "title": f"{brand} {adjective} {noun}",
+            "price": price,
+            "description": f"{adjective} {noun.lower()} by {brand} in {color}. {SENTENCES[sentence]}",
+            "brand": brand,
+            "model": f"{brand[0].upper()}{model}",
+            "color": color,
+            "category": category,
+            "discountPercentage": round(discount, 2) if on_discount else 0.0,
+            "stockQuantity": stock_count,
+            "rating_rate": round(rating, 1),
+            "rating_count": rating_count,
+            "availabilityStatus": stock_status(stock_count),
+        })
+    return products
+
+
+def user_block(seed: int, start: int, stop: int, hashed_password: str) -> List[dict]:
+    """fake_user for start <= k < stop."""
+    key = _keys(seed, "user", np.arange(start, stop))
+    columns = zip(
+        range(start, stop),
+        _indexes(unit(key, _FIRST_NAME), len(FIRST_NAMES)).tolist(),
+        _indexes(unit(key, _LAST_NAME), len(LAST_NAMES)).tolist(),
+        (unit(key, _ACTIVE) < 0.9).tolist(),
+        (unit(key, _ROLE) < 0.02).tolist(),
+    )
+    return [
+        {
+            "full_name": f"{FIRST_NAMES[first]} {LAST_NAMES[last]}",
+            "email": f"{FIRST_NAMES[first]}.{LAST_NAMES[last]}.{seed}-{k}@example.com".lower(),
+            "hashed_password": hashed_password,
+            "is_active": active,
+            "role": "admin" if admin else "user",
+        }
+        for k, first, last, active, admin in columns
+    ]
+
+
+def order_block(seed: int, start: int, stop: int, products: int, users: int,
+                config: FakeDataConfig = FakeDataConfig()) -> List[dict]:
+    """fake_order for start <= k < stop."""
+    key = _keys(seed, "order", np.arange(start, stop))
+    line_counts = 1 + _indexes(unit(key, _LINES), MAX_ORDER_LINES)
+    # One column per possible line; lines past an order's count are ignored
+    line_products = np.stack([_indexes(unit(key, _LINE_PRODUCT + line), products) for line in range(MAX_ORDER_LINES)], axis=1)
+    quantities = np.stack([1 + (unit(key, _LINE_QUANTITY + line) * 3).astype(np.int64) for line in range(MAX_ORDER_LINES)], axis=1)
+    prices = np.array(_prices(_keys(seed, "product", line_products.ravel()), config)).reshape(line_products.shape)
+
+    columns = zip(
+        range(start, stop), line_counts.tolist(), line_products.tolist(), quantities.tolist(), prices.tolist(),
+        _indexes(unit(key, _USER), users).tolist(), _indexes(unit(key, _STATUS), len(ORDER_STATUSES)).tolist(),
+        _timestamps(key),
+    )
+    return [
+        order_record(k, user, ORDER_STATUSES[status], list(zip(line_products[:count], line_quantities[:count])), line_prices[:count], created_at)
+        for k, count, line_products, line_quantities, line_prices, user, status, created_at in columns
+    ]
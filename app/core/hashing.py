@@ -0,0 +1,124 @@
+# app/core/hashing.py
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+load_dotenv("env/.env")
+
+# How many passwords are hashed at once, and how many more may wait their turn.
+# PBKDF2 runs in OpenSSL with the GIL released, so threads scale with cores;
+# PASSWORD_HASH_EXECUTOR=process sidesteps the GIL for schemes that hold it.
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 4 * PASSWORD_HASH_WORKERS))
+# Seconds a client rejected with 503 is told to wait
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+
+LATENCY_SAMPLES = 1024
+
+
+def _timed(fn: Callable, *args):
+    # Runs in the worker; the start time tells queue wait apart from hashing
+    started = time.monotonic()
+    return fn(*args), started, time.monotonic()
+
+
+def _percentiles(samples) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    return {
+        f"p{rank}_ms": ordered[max(math.ceil(rank / 100 * len(ordered)), 1) - 1] * 1000
+        for rank in (50, 95, 99)
+    }
+
+
+class PasswordHasher:
+    """A sized executor for password hashing with a bounded queue.
+
+    Hashes never run on the shared threadpool, so a burst of logins can only
+    slow down other logins. Once `workers` hashes are running and `max_queue`
+    more are waiting, further calls are rejected with 503 and Retry-After
+    instead of piling up behind them.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_QUEUE,
+                 kind: str = PASSWORD_HASH_EXECUTOR, retry_after: int = PASSWORD_HASH_RETRY_AFTER):
+        if kind not in ("thread", "process"):
+            raise ValueError("PASSWORD_HASH_EXECUTOR must be thread or process")
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self.kind = kind
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=LATENCY_SAMPLES)
+        self._hashes = deque(maxlen=LATENCY_SAMPLES)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        """fn(*args) on the hashing executor; 503 when the queue is full."""
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many password operations in progress, please retry",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._pending += 1
+            executor = self._get_executor()
+
+        submitted = time.monotonic()
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(executor, _timed, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self.completed += 1
+            self._waits.append(max(started - submitted, 0.0))
+            self._hashes.append(finished - started)
+        return result
+
+    def shutdown(self):
+        # A later run() starts a fresh executor
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.workers),
+                "queue_depth": max(self._pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait": _percentiles(self._waits),
+                "hash_latency": _percentiles(self._hashes),
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,64 @@
+# app/core/responses.py
+
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+load_dotenv("env/.env")
+
+# Set FAST_JSON_RESPONSES=0 to hand every response back to FastAPI for
+# response_model validation, e.g. to compare against the fast path.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "1") != "0"
+
+# Streamed listings: one JSON document per line
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(content: Any) -> bytes:
+    """Encode `content`. Envelope models are unpacked one level rather than
+    dumped, so items controllers already built as plain dicts are encoded as
+    they are."""
+    if isinstance(content, BaseModel):
+        content = dict(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (stdlib json when not installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def fast_json(content: Any, headers: Optional[Dict[str, str]] = None):
+    """Return `content` as a FastJSONResponse, bypassing response_model validation.
+
+    The route's response_model still documents the shape in OpenAPI. With
+    FAST_JSON_RESPONSES off, `content` is returned for FastAPI to validate, or
+    encoded with jsonable_encoder when the route has headers to set.
+    """
+    if FAST_JSON_RESPONSES:
+        return FastJSONResponse(content, headers=headers)
+    if headers is None:
+        return content
+    return JSONResponse(jsonable_encoder(content), headers=headers)
@@ -4,12 +4,14 @@ from fastapi import Depends, HTTPException, status
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 import os
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi.security import OAuth2PasswordBearer
-from app.database.config import get_db
+from app.database.config import get_async_db
 from app.database.models import User
 
 load_dotenv("env/.env")
@@ -22,10 +24,21 @@ OTP_EXPIRE_MINUTES = os.getenv("OTP_EXPIRE_MINUTES", 1)
 if not SECRET_KEY:
     raise ValueError("SECRET_KEY environment variable is not set")
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Schemes and costs written by `python -m app.scripts.calibrate_password_hash`;
+# without the file, passlib's default rounds for pbkdf2_sha256 apply
+PASSWORD_HASH_POLICY = os.getenv("PASSWORD_HASH_POLICY", "env/password_hash.ini")
+
+
+def load_password_context(path: str = PASSWORD_HASH_POLICY) -> CryptContext:
+    if os.path.exists(path):
+        return CryptContext.from_path(path)
+    return CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+
+pwd_context = load_password_context()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/admin/api/token")
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -37,7 +50,7 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
         if user_email is None:
             raise credentials_exception
         
-        user = db.query(User).filter(User.email == user_email).first()
+        user = await db.scalar(select(User).where(User.email == user_email))
         if user is None:
             raise credentials_exception
     except JWTError:
@@ -79,7 +92,7 @@ def decode_refresh_token(token: str):
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
     
-def get_user_from_refresh_token(refresh_token: str, db: Session) -> User:
+async def get_user_from_refresh_token(refresh_token: str, db: AsyncSession) -> User:
     # Decode the refresh token to get the user email or ID
     try:
         payload = decode_refresh_token(refresh_token)
@@ -89,7 +102,7 @@ def get_user_from_refresh_token(refresh_token: str, db: Session) -> User:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
     # Query the user based on the email
-    user = db.query(User).filter(User.email == user_email).first()
+    user = await db.scalar(select(User).where(User.email == user_email))
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -102,5 +115,9 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    # (valid, new hash); the new hash is set when the stored one no longer matches the policy
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 
     
\ No newline at end of file
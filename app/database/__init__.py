@@ -1 +1 @@
-from .config import get_db
\ No newline at end of file
+from .config import get_async_db, get_db
\ No newline at end of file
@@ -0,0 +1,57 @@
+# app/database/catalog_state.py
+
+from typing import Optional
+from sqlalchemy import DateTime, Integer, column, select, table, text
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Single-row table. `generation` goes up by one on every write to products, so
+# (generation, request) identifies a listing response without reading it.
+catalog_state = table(
+    "catalog_state",
+    column("id", Integer),
+    column("generation", Integer),
+    column("updated_at", DateTime),
+)
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS catalog_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        generation INTEGER NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+"""
+
+_BUMP = "UPDATE catalog_state SET generation = generation + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1;"
+
+_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS catalog_state_ai AFTER INSERT ON products BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_state_ad AFTER DELETE ON products BEGIN {_BUMP} END",
+    f"CREATE TRIGGER IF NOT EXISTS catalog_state_au AFTER UPDATE ON products BEGIN {_BUMP} END",
+]
+
+
+def init_catalog_state(engine: Engine):
+    """Create catalog_state and the triggers that advance its generation.
+
+    SQLite only, like the other trigger-maintained tables; elsewhere listings
+    are served without validators.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(_CREATE_TABLE))
+        conn.execute(text(
+            "INSERT OR IGNORE INTO catalog_state(id, generation, updated_at) VALUES (1, 1, CURRENT_TIMESTAMP)"
+        ))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+
+
+async def read_catalog_state(db: AsyncSession) -> Optional[Row]:
+    """(generation, updated_at) of the catalog, or None where it isn't tracked."""
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    stmt = select(catalog_state.c.generation, catalog_state.c.updated_at).where(catalog_state.c.id == 1)
+    return (await db.execute(stmt)).first()
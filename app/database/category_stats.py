@@ -0,0 +1,99 @@
+# app/database/category_stats.py
+
+from sqlalchemy import Float, Integer, String, column, inspect, table, text
+from sqlalchemy.engine import Connection, Engine
+
+# Core handle on the per-category aggregates. avg price is price_sum / price_count.
+category_stats = table(
+    "category_stats",
+    column("category", String),
+    column("product_count", Integer),
+    column("price_count", Integer),
+    column("price_sum", Float),
+    column("min_price", Float),
+    column("max_price", Float),
+    column("in_stock_count", Integer),
+)
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS category_stats (
+        category VARCHAR PRIMARY KEY NOT NULL,
+        product_count INTEGER NOT NULL,
+        price_count INTEGER NOT NULL,
+        price_sum FLOAT NOT NULL,
+        min_price FLOAT,
+        max_price FLOAT,
+        in_stock_count INTEGER NOT NULL
+    )
+"""
+
+# Counts and sums are adjusted by the row that changed. Min and max are re-read
+# from ix_products_category_price, which is a single index seek.
+_ADD = """
+    INSERT INTO category_stats(category, product_count, price_count, price_sum, min_price, max_price, in_stock_count)
+    SELECT new.category, 1, new.price IS NOT NULL, COALESCE(new.price, 0), new.price, new.price,
+           COALESCE(new.stockQuantity, 0) > 0
+    WHERE new.category IS NOT NULL
+    ON CONFLICT(category) DO UPDATE SET
+        product_count = product_count + 1,
+        price_count = price_count + excluded.price_count,
+        price_sum = price_sum + excluded.price_sum,
+        min_price = (SELECT MIN(price) FROM products WHERE category = new.category),
+        max_price = (SELECT MAX(price) FROM products WHERE category = new.category),
+        in_stock_count = in_stock_count + excluded.in_stock_count;
+"""
+
+_REMOVE = """
+    UPDATE category_stats SET
+        product_count = product_count - 1,
+        price_count = price_count - (old.price IS NOT NULL),
+        price_sum = price_sum - COALESCE(old.price, 0),
+        min_price = (SELECT MIN(price) FROM products WHERE category = old.category),
+        max_price = (SELECT MAX(price) FROM products WHERE category = old.category),
+        in_stock_count = in_stock_count - (COALESCE(old.stockQuantity, 0) > 0)
+    WHERE category = old.category;
+    DELETE FROM category_stats WHERE category = old.category AND product_count <= 0;
+"""
+
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_stats_ai AFTER INSERT ON products BEGIN {_ADD} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_stats_ad AFTER DELETE ON products BEGIN {_REMOVE} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_stats_au AFTER UPDATE OF category, price, stockQuantity ON products BEGIN
+        {_REMOVE} {_ADD}
+    END
+    """,
+]
+
+
+def rebuild_category_stats(conn: Connection):
+    """Recompute every category's aggregates from the products table."""
+    conn.execute(text("DELETE FROM category_stats"))
+    conn.execute(text(
+        "INSERT INTO category_stats(category, product_count, price_count, price_sum, min_price, max_price, in_stock_count) "
+        "SELECT category, COUNT(*), COUNT(price), COALESCE(SUM(price), 0), MIN(price), MAX(price), "
+        "SUM(COALESCE(stockQuantity, 0) > 0) "
+        "FROM products WHERE category IS NOT NULL GROUP BY category"
+    ))
+
+
+def init_category_stats(engine: Engine):
+    """Create category_stats and the triggers that keep it in sync with products.
+
+    Like the search index, triggers cover every write path, including bulk
+    imports and raw SQL. SQLite only; other databases aggregate on read.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = inspect(conn).has_table("category_stats")
+        conn.execute(text(_CREATE_TABLE))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+        if not exists:
+            rebuild_category_stats(conn)
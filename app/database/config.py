@@ -2,8 +2,14 @@
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
 import os
+from app.database.catalog_state import init_catalog_state
+from app.database.category_stats import init_category_stats
+from app.database.fts import init_product_search
+from app.database.product_changes import init_product_changes
+from app.database.product_columns import add_product_columns
 
 # Load environment variables from .env file
 load_dotenv()
@@ -17,6 +23,24 @@ engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 # Session local for each request
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> str:
+    # aiosqlite locally, asyncpg for Postgres; a URL that already names a driver is kept
+    for sync_scheme, async_scheme in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(sync_scheme):
+            return async_scheme + url[len(sync_scheme):]
+    return url
+
+
+# Async engine and sessions for async def routes. Objects stay loaded after
+# commit because an expired attribute can't be lazily re-read without await.
+async_engine = create_async_engine(async_database_url(DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 # Base model class for all database models
 Base = declarative_base()
 
@@ -28,6 +52,16 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get an AsyncSession for async routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Initialize database and create tables
-def init_db():
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=engine):
+    Base.metadata.create_all(bind=bind)
+    add_product_columns(bind)
+    init_product_search(bind)
+    init_category_stats(bind)
+    init_catalog_state(bind)
+    init_product_changes(bind)
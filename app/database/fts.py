@@ -0,0 +1,83 @@
+# app/database/fts.py
+
+import re
+from sqlalchemy import Float, Integer, String, column, inspect, table, text
+from sqlalchemy.engine import Engine
+
+# Core handle on the FTS5 index; `products_fts` is the hidden column MATCH runs
+# against and `rank` is bm25 with the weights configured below.
+products_fts = table(
+    "products_fts",
+    column("rowid", Integer),
+    column("rank", Float),
+    column("products_fts", String),
+)
+
+# bm25 weights per indexed column: title, description, brand, model
+RANK_FUNCTION = "bm25(10.0, 1.0, 5.0, 5.0)"
+
+_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, title, description, brand, model)
+        VALUES (new.id, new.title, new.description, new.brand, new.model);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, title, description, brand, model)
+        VALUES ('delete', old.id, old.title, old.description, old.brand, old.model);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF title, description, brand, model ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, title, description, brand, model)
+        VALUES ('delete', old.id, old.title, old.description, old.brand, old.model);
+        INSERT INTO products_fts(rowid, title, description, brand, model)
+        VALUES (new.id, new.title, new.description, new.brand, new.model);
+    END
+    """,
+]
+
+
+def init_product_search(engine: Engine):
+    """Create the products_fts index and the triggers that keep it in sync.
+
+    The index is external-content, so it stores no copy of the text. Triggers
+    rather than controller hooks keep it current, which also covers writes that
+    bypass the ORM. SQLite only; other databases skip search.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = inspect(conn).has_table("products_fts")
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+            "title, description, brand, model, "
+            "content='products', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        ))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+        if not exists:
+            conn.execute(text(
+                "INSERT INTO products_fts(products_fts, rank) VALUES ('rank', :rank)"
+            ), {"rank": RANK_FUNCTION})
+            # Index rows that predate the search table
+            conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+
+
+def build_match_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query.
+
+    Every word is quoted so user input can't inject FTS5 syntax; a trailing `*`
+    keeps its meaning as a prefix search. Words are ANDed together.
+    """
+    terms = [
+        f'"{word}"' + ("*" if star else "")
+        for word, star in re.findall(r"(\w+)(\*?)", q)
+    ]
+    if not terms:
+        raise ValueError("Search query is empty")
+    return " ".join(terms)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Float, Integer, String, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text, ForeignKey, literal_column
+from sqlalchemy.orm import deferred, relationship
 from app.database.config import Base  # Import Base from your database setup
 
 class Product(Base):
@@ -13,12 +14,41 @@ class Product(Base):
     model = Column(String, nullable=True)
     color = Column(String, nullable=True)
     category = Column(String)
-    image = Column(String, nullable=True)  # Base64 encoded image
+    # Legacy inline base64 image. New images live in the blob store and rows only
+    # keep image_ref; the column is deferred so listings never read it.
+    image = deferred(Column(String, nullable=True))
+    image_ref = Column(String(64), nullable=True)  # SHA-256 of the image in the blob store
     discountPercentage = Column(Float, nullable=True)
     stockQuantity = Column(Integer, nullable=True)
     rating_rate = Column(Float, nullable=True)
     rating_count = Column(Integer, nullable=True)
     availabilityStatus = Column(String, nullable=True)
-    
+    # Bumped by every UPDATE, ORM or Core, and used as the product's ETag
+    version = Column(Integer, nullable=False, default=1, onupdate=literal_column("version + 1"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Keyset pagination seeks on (sort column, id). Title's own index already
+    # ends in the rowid on SQLite, so it needs no composite here.
+    __table_args__ = (
+        Index("ix_products_category_id", "category", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_rating_rate_id", "rating_rate", "id"),
+        # Faceted /query filters: an equality facet followed by the range it is
+        # most often combined with, plus the ranges that are queried alone.
+        Index("ix_products_category_price", "category", "price"),
+        Index("ix_products_brand_price", "brand", "price"),
+        Index("ix_products_color_price", "color", "price"),
+        Index("ix_products_availability_stock", "availabilityStatus", "stockQuantity"),
+        Index("ix_products_discount", "discountPercentage"),
+        Index("ix_products_stock", "stockQuantity"),
+    )
+
+    @property
+    def rating(self):
+        # Exposes the flattened rating columns in the nested shape of schemas.product.Rating
+        if self.rating_rate is None and self.rating_count is None:
+            return None
+        return {"rate": self.rating_rate, "count": self.rating_count}
+
     # If you have relationships, define them here (e.g., with Category)
 
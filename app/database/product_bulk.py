@@ -0,0 +1,67 @@
+# app/database/product_bulk.py
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+from app.database.models.products import Product
+
+# What each AFTER INSERT trigger on products does, restated for every product
+# with id > :first_id at once
+_CATCH_UP = {
+    "products_fts_ai": """
+        INSERT INTO products_fts(rowid, title, description, brand, model)
+        SELECT id, title, description, brand, model FROM products WHERE id > :first_id
+    """,
+    "category_stats_ai": """
+        INSERT INTO category_stats(category, product_count, price_count, price_sum, min_price, max_price, in_stock_count)
+        SELECT category, COUNT(*), COUNT(price), COALESCE(SUM(price), 0), MIN(price), MAX(price),
+               SUM(COALESCE(stockQuantity, 0) > 0)
+        FROM products WHERE id > :first_id AND category IS NOT NULL GROUP BY category
+        ON CONFLICT(category) DO UPDATE SET
+            product_count = product_count + excluded.product_count,
+            price_count = price_count + excluded.price_count,
+            price_sum = price_sum + excluded.price_sum,
+            min_price = (SELECT MIN(price) FROM products WHERE category = excluded.category),
+            max_price = (SELECT MAX(price) FROM products WHERE category = excluded.category),
+            in_stock_count = in_stock_count + excluded.in_stock_count
+    """,
+    "product_changes_ai": """
+        INSERT OR REPLACE INTO product_changes(product_id, seq, deleted, changed_at)
+        SELECT id, (SELECT COALESCE(MAX(seq), 0) FROM product_changes) + id - :first_id, 0, CURRENT_TIMESTAMP
+        FROM products WHERE id > :first_id
+    """,
+}
+
+
+def insert_products(db: Session, rows: list):
+    """INSERT `rows` into products in the session's transaction, with the
+    per-row insert triggers suspended.
+
+    Row-at-a-time trigger work (search index, category stats, change log,
+    catalog generation) costs several times the insert itself, so the triggers
+    are dropped, the rows inserted, the same effects applied with one statement
+    each, and the triggers recreated. It all happens in one transaction: SQLite
+    DDL is transactional and the write lock is held throughout, so no other
+    connection ever sees the triggers missing. Elsewhere it is a plain INSERT.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        db.execute(insert(Product), rows)
+        return
+
+    # A write has to come first: it opens the transaction (the sqlite3 driver
+    # doesn't for DDL) and takes the write lock, which keeps new ids contiguous
+    db.execute(text(
+        "UPDATE catalog_state SET generation = generation + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+    ))
+    triggers = db.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'products' "
+        "AND name IN ('catalog_state_ai', " + ", ".join(f"'{name}'" for name in _CATCH_UP) + ")"
+    )).all()
+    for trigger in triggers:
+        db.execute(text(f'DROP TRIGGER "{trigger.name}"'))
+
+    first_id = db.scalar(text("SELECT COALESCE(MAX(id), 0) FROM products"))
+    db.execute(insert(Product.__table__), rows)
+    for trigger in triggers:
+        if trigger.name in _CATCH_UP:
+            db.execute(text(_CATCH_UP[trigger.name]), {"first_id": first_id})
+        db.execute(text(trigger.sql))
@@ -0,0 +1,62 @@
+# app/database/product_changes.py
+
+from sqlalchemy import Boolean, DateTime, Integer, column, inspect, table, text
+from sqlalchemy.engine import Engine
+
+# One row per product that has ever existed, holding its latest change. `seq`
+# only goes up, so "everything after seq N" is a range on ix_product_changes_seq
+# and a product written many times since N is returned once. Deleted products
+# stay behind as tombstones (deleted = 1).
+product_changes = table(
+    "product_changes",
+    column("product_id", Integer),
+    column("seq", Integer),
+    column("deleted", Boolean),
+    column("changed_at", DateTime),
+)
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS product_changes (
+        product_id INTEGER PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        deleted BOOLEAN NOT NULL,
+        changed_at DATETIME NOT NULL
+    )
+"""
+
+_CREATE_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS ix_product_changes_seq ON product_changes(seq)"
+
+# MAX(seq) is the last entry of the seq index
+_RECORD = """
+    INSERT OR REPLACE INTO product_changes(product_id, seq, deleted, changed_at)
+    VALUES ({id}, (SELECT COALESCE(MAX(seq), 0) + 1 FROM product_changes), {deleted}, CURRENT_TIMESTAMP);
+"""
+
+_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS product_changes_ai AFTER INSERT ON products BEGIN {_RECORD.format(id='new.id', deleted=0)} END",
+    f"CREATE TRIGGER IF NOT EXISTS product_changes_ad AFTER DELETE ON products BEGIN {_RECORD.format(id='old.id', deleted=1)} END",
+    f"CREATE TRIGGER IF NOT EXISTS product_changes_au AFTER UPDATE ON products BEGIN {_RECORD.format(id='new.id', deleted=0)} END",
+]
+
+
+def init_product_changes(engine: Engine):
+    """Create product_changes and the triggers that record every product write.
+
+    Existing products are recorded on creation, in id order, so a feed read
+    from seq 0 starts with the whole catalog. SQLite only, like the other
+    trigger-maintained tables.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = inspect(conn).has_table("product_changes")
+        conn.execute(text(_CREATE_TABLE))
+        conn.execute(text(_CREATE_INDEX))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+        if not exists:
+            conn.execute(text(
+                "INSERT INTO product_changes(product_id, seq, deleted, changed_at) "
+                "SELECT id, id, 0, CURRENT_TIMESTAMP FROM products"
+            ))
@@ -0,0 +1,24 @@
+# app/database/product_columns.py
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# Columns added to products after databases were already in use, with the DDL
+# that adds them. create_all never alters an existing table, so init_db adds
+# whichever are missing.
+ADDED_COLUMNS = [
+    ("image_ref", "VARCHAR(64)"),
+    ("version", "INTEGER NOT NULL DEFAULT 1"),
+    ("updated_at", "DATETIME"),
+]
+
+
+def add_product_columns(engine: Engine):
+    """ALTER TABLE products for each missing column of ADDED_COLUMNS; safe to run repeatedly."""
+    with engine.begin() as conn:
+        if not inspect(conn).has_table("products"):
+            return
+        existing = {column["name"] for column in inspect(conn).get_columns("products")}
+        for name, ddl in ADDED_COLUMNS:
+            if name not in existing:
+                conn.execute(text(f'ALTER TABLE products ADD COLUMN "{name}" {ddl}'))
@@ -0,0 +1,30 @@
+# app/database/records.py
+
+from typing import List, NamedTuple, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.models import User
+
+# Read-only views of rows, fetched with Core selects of just their columns. They
+# never enter the session's identity map and carry no ORM instance state.
+
+
+class UserRecord(NamedTuple):
+    id: int
+    full_name: Optional[str]
+    email: str
+    role: str
+    is_active: bool
+
+
+USER_RECORD_COLUMNS = (User.id, User.full_name, User.email, User.role, User.is_active)
+
+
+async def fetch_users(db: AsyncSession) -> List[UserRecord]:
+    result = await db.execute(select(*USER_RECORD_COLUMNS).order_by(User.id))
+    return [UserRecord._make(row) for row in result]
+
+
+async def fetch_user(db: AsyncSession, user_id: int) -> Optional[UserRecord]:
+    row = (await db.execute(select(*USER_RECORD_COLUMNS).where(User.id == user_id))).first()
+    return None if row is None else UserRecord._make(row)
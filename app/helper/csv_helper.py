@@ -1,3 +1,20 @@
-# def dict_to_json(data_dict):
-#     import json
-#     return json.dumps(data_dict)
+# app/helper/csv_helper.py
+
+import csv
+import io
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+
+def iter_csv_records(stream: BinaryIO, encoding: str = "utf-8") -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, record, error) for each data row of a CSV stream.
+
+    Rows are read one at a time, so the stream can be arbitrarily large. Empty
+    cells become None. Row numbers count the header as row 1, as spreadsheets do.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding=encoding, newline=""))
+    for row in reader:
+        row_number = reader.line_num
+        if None in row:
+            yield row_number, None, "Row has more fields than the header"
+            continue
+        yield row_number, {key: (value if value != "" else None) for key, value in row.items()}, None
@@ -1,3 +1,24 @@
-# def dict_to_json(data_dict):
-#     import json
-#     return json.dumps(data_dict)
+# app/helper/json_helper.py
+
+import json
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+
+def iter_ndjson_records(stream: BinaryIO) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line number, record, error) for each non-blank line of an NDJSON stream.
+
+    A line that isn't a JSON object is reported through `error` instead of
+    stopping the iteration.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
@@ -0,0 +1,39 @@
+# app/helper/stream_helper.py
+
+import io
+from typing import AsyncIterator, Optional
+from anyio.from_thread import run as run_from_thread
+
+
+class AsyncStreamReader(io.RawIOBase):
+    """A blocking, read-only file over an async iterator of byte chunks.
+
+    For parsers that want a file, run in a worker thread: each read waits on
+    the event loop for the next chunk, so a request body can be parsed as it
+    arrives instead of being buffered first. Must be used from a thread
+    started by anyio, such as run_in_threadpool.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._pending = memoryview(b"")
+        self._done = False
+
+    def readable(self) -> bool:
+        return True
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._done:
+            chunk = run_from_thread(self._next_chunk)
+            self._done = chunk is None
+            self._pending = memoryview(chunk or b"")
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
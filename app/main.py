@@ -15,7 +15,10 @@
 from fastapi import FastAPI
 from app.api.auth.admin.routes import router as admin_router 
 from app.api.email.routes import email as email_router
+from app.api.fake.routes import fake as fake_router
 from app.api.products.routes import product as product_rouer
+from app.core.compression import CompressionMiddleware
+from app.core.hashing import password_hasher
 from app.database.config import init_db
 
 app = FastAPI(
@@ -27,13 +30,23 @@ app = FastAPI(
 
 
 
+# Negotiated gzip/br/zstd for JSON and NDJSON responses
+app.add_middleware(CompressionMiddleware)
+
 @app.on_event("startup")
 def startup_event():
     init_db()
 
+@app.on_event("shutdown")
+def shutdown_event():
+    password_hasher.shutdown()
+
 # Register the admin router with a versioned prefix
 app.include_router(admin_router, prefix="/v1/auth/admin/api")
 
 app.include_router(email_router, prefix="/v1/email")
 
 app.include_router(product_rouer, prefix="/v1/products/api" )
+
+# Seeded mock data, generated per request without touching the database
+app.include_router(fake_router, prefix="/v1/fake")
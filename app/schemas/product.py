@@ -1,11 +1,13 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 
 class Rating(BaseModel):
     rate: Optional[float] = None
     count: Optional[int] = None
 
 class ProductBase(BaseModel):
+    id: Optional[int] = None  # Assigned by the database, ignored on create
     title: str
     price: float
     description: str
@@ -13,7 +15,7 @@ class ProductBase(BaseModel):
     model: Optional[str] = None
     color: Optional[str] = None
     category: str
-    image: Optional[str] = None
+    image_ref: Optional[str] = None  # Served by /images/{image_ref}
     discountPercentage: Optional[float] = None
     stockQuantity: Optional[int] = None
     rating: Optional[Rating] = None
@@ -22,8 +24,12 @@ class ProductBase(BaseModel):
     class Config:
         from_attributes = True
 
+# A full product, or a plain dict holding just the fields asked for with ?fields=.
+# Dict comes first so a sparse dict is never padded out into a ProductBase.
+ProductData = Union[Dict[str, Any], ProductBase]
+
 class ProductCreate(ProductBase):
-    pass
+    image: Optional[str] = None  # Base64 encoded image, moved to the blob store on create
 
 class ProductUpdate(BaseModel):
     title: Optional[str] = None
@@ -33,7 +39,7 @@ class ProductUpdate(BaseModel):
     model: Optional[str] = None
     color: Optional[str] = None
     category: Optional[str] = None
-    image: Optional[str] = None
+    image: Optional[str] = None  # Base64 encoded image, moved to the blob store on update
     discountPercentage: Optional[float] = None
     stockQuantity: Optional[int] = None
     rating: Optional[Rating] = None
@@ -42,12 +48,13 @@ class ProductUpdate(BaseModel):
 class ProductResponse(BaseModel):
     status: str
     message: str
-    data: Optional[List[ProductBase]] = None 
+    data: Optional[List[ProductData]] = None 
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 class SingleProductResponse(BaseModel):
     status: str
     message: str
-    data: Optional[ProductBase] = None  # Single product details
+    data: Optional[ProductData] = None  # Single product details
 
     class Config:
         from_attributes = True
@@ -55,9 +62,101 @@ class SingleProductResponse(BaseModel):
 class ProductsResponse(BaseModel):
     status: str
     message: str
-    data: List[ProductBase]
+    data: List[ProductData]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int]
+
+class ProductBatchResponse(BaseModel):
+    status: str
+    message: str
+    data: List[ProductData]  # In the requested order
+    missing: List[int]  # Requested ids that don't exist
+
+class ProductFilters(BaseModel):
+    category: Optional[List[str]] = None
+    brand: Optional[List[str]] = None
+    color: Optional[List[str]] = None
+    availabilityStatus: Optional[List[str]] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    rating_min: Optional[float] = None
+    rating_max: Optional[float] = None
+    discount_min: Optional[float] = None
+    discount_max: Optional[float] = None
+    stock_min: Optional[int] = None
+    stock_max: Optional[int] = None
+    in_stock: Optional[bool] = None
+
+class ProductQueryResponse(BaseModel):
+    status: str
+    message: str
+    data: Optional[List[ProductData]] = None
+    next_cursor: Optional[str] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None  # Facet name -> value -> product count
+
+class BulkRowError(BaseModel):
+    row: int  # CSV row or NDJSON line number
+    errors: List[str]
+
+class BulkImportResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkRowError]  # Capped; `failed` has the full count
+
+class BulkImportResponse(BaseModel):
+    status: str
+    message: str
+    data: Optional[BulkImportResult] = None
+
+class CategoryStats(BaseModel):
+    category: str
+    product_count: int
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    avg_price: Optional[float] = None
+    in_stock_count: int
 
 class CategoryResponse(BaseModel):
     status: str
     message: str
-    data: Optional[List[str]] = None  # List of category names
\ No newline at end of file
+    data: Optional[List[str]] = None  # List of category names
+    stats: Optional[List[CategoryStats]] = None  # Same order as data
+
+class ProductChange(BaseModel):
+    seq: int
+    id: int
+    deleted: bool  # A tombstone; product is None
+    changed_at: datetime
+    product: Optional[ProductData] = None
+
+class ChangesResponse(BaseModel):
+    status: str
+    message: str
+    data: Optional[List[ProductChange]] = None  # In seq order
+    next_since: Optional[int] = None  # Pass back as ?since= for the next page
+    has_more: bool = False
+
+class HistogramBucket(BaseModel):
+    lower: Optional[float] = None  # Inclusive; None for the open first bucket
+    upper: Optional[float] = None  # Exclusive; None for the open last bucket
+    count: int
+
+class StatsGroup(BaseModel):
+    key: Dict[str, Optional[str]]  # Group-by dimension -> value
+    count: int
+    averages: Dict[str, Optional[float]]
+
+class ProductStats(BaseModel):
+    count: int
+    averages: Dict[str, Optional[float]]  # Metric -> mean over non-null values
+    groups: Optional[List[StatsGroup]] = None
+    histograms: Optional[Dict[str, List[HistogramBucket]]] = None
+    percentiles: Optional[Dict[str, Dict[str, Optional[float]]]] = None  # Metric -> "p50" -> value
+
+class StatsResponse(BaseModel):
+    status: str
+    message: str
+    data: Optional[ProductStats] = None
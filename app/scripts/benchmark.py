@@ -0,0 +1,406 @@
+# app/scripts/benchmark.py
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+import httpx
+
+# python -m app.scripts.benchmark --concurrency 1,16 --requests 500 --output bench.json
+# python -m app.scripts.benchmark --server uvicorn --compare bench.json
+# python -m app.scripts.benchmark --preset json-modes
+# python -m app.scripts.benchmark --preset concurrency-sweep --base-url http://127.0.0.1:8000 --database sqlite:///./jazzyapi.db
+# Seeds a scratch database unless --database is given, drives every router
+# in-process through httpx.ASGITransport (or a real uvicorn worker) and reports
+# throughput, latency percentiles and database queries per request.
+
+PASSWORD = "password"
+# Regressions smaller than this share of the baseline are treated as noise
+DEFAULT_TOLERANCE = 0.10
+
+# Named sets of option defaults; flags given on the command line still win
+PRESETS = {
+    # One large listing page, validated by FastAPI and then through FAST_JSON_RESPONSES
+    "json-modes": {"endpoints": ["page_size=500$"], "json_modes": True, "concurrency": "1"},
+    # Throughput of one listing as the number of requests in flight grows
+    "concurrency-sweep": {"endpoints": ["GET /all/products$"], "concurrency": "1,10,50,100,200",
+                          "requests": 2000, "server": "uvicorn"},
+}
+
+# Statements run on behalf of the current request; set per request by counting_app
+_queries: contextvars.ContextVar = contextvars.ContextVar("benchmark_queries", default=None)
+
+
+class Endpoint(NamedTuple):
+    name: str
+    router: str
+    method: str
+    path: Callable[[int], str]  # Request number to path, so requests can spread over ids
+    body: Optional[dict] = None
+    auth: bool = False
+    max_requests: Optional[int] = None  # For endpoints too slow to run the full count
+
+
+def endpoints(products: int, users: int, categories: List[str], email: str) -> List[Endpoint]:
+    products_api, admin_api = "/v1/products/api", "/v1/auth/admin/api"
+    return [
+        Endpoint("GET /all/products", "products", "GET", lambda i: f"{products_api}/all/products"),
+        Endpoint("GET /all/products?page_size=500", "products", "GET",
+                 lambda i: f"{products_api}/all/products?page_size=500"),
+        Endpoint("GET /product/{id}", "products", "GET", lambda i: f"{products_api}/product/{i % products + 1}"),
+        Endpoint("GET /category/{category}", "products", "GET",
+                 lambda i: f"{products_api}/category/{categories[i % len(categories)]}"),
+        Endpoint("GET /categories", "products", "GET", lambda i: f"{products_api}/categories"),
+        Endpoint("GET /sorted", "products", "GET", lambda i: f"{products_api}/sorted?sort=-price"),
+        Endpoint("GET /search", "products", "GET", lambda i: f"{products_api}/search?q=wireless"),
+        Endpoint("GET /query", "products", "GET",
+                 lambda i: f"{products_api}/query?price_min=20&price_max=200&facets=true"),
+        Endpoint("GET /stats", "products", "GET", lambda i: f"{products_api}/stats?group_by=category&histogram=price"),
+        Endpoint("GET /changes", "products", "GET", lambda i: f"{products_api}/changes?since={i % products}"),
+        Endpoint("GET /batch", "products", "GET",
+                 lambda i: f"{products_api}/batch?ids=" + ",".join(str((i + step) % products + 1) for step in range(20))),
+        Endpoint("GET /v1/fake/products", "fake", "GET", lambda i: f"/v1/fake/products?count=1000&start={i * 1000}"),
+        Endpoint("GET /current-user", "admin", "GET", lambda i: f"{admin_api}/current-user", auth=True),
+        Endpoint("GET /users", "admin", "GET", lambda i: f"{admin_api}/users", auth=True),
+        Endpoint("GET /users/{id}", "admin", "GET", lambda i: f"{admin_api}/users/{i % users + 1}", auth=True),
+        Endpoint("POST /login", "admin", "POST", lambda i: f"{admin_api}/login",
+                 body={"email": email, "password": PASSWORD}, max_requests=50),
+        Endpoint("POST /send-email", "email", "POST", lambda i: "/v1/email/send-email", body={
+            "to_email": "benchmark@example.com", "subject": "Benchmark", "message": "Benchmark message",
+        }),
+    ]
+
+
+def count_queries(*engines):
+    """Count statements per request on these engines (sync, or the sync side of async ones)."""
+    from sqlalchemy import event
+
+    def before_cursor_execute(*_):
+        counter = _queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    for engine in engines:
+        event.listen(getattr(engine, "sync_engine", engine), "before_cursor_execute", before_cursor_execute)
+
+
+def counting_app(app):
+    """Wrap an ASGI app so every response carries X-DB-Queries.
+
+    The count is taken when the response starts, so statements a streaming
+    body runs afterwards are not included.
+    """
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+        counter = [0]
+        _queries.set(counter)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-db-queries", str(counter[0]).encode())]
+            await send(message)
+
+        await app(scope, receive, send_with_count)
+    return wrapped
+
+
+def stub_smtp():
+    # Nothing may leave the machine; the email router still does everything up to the SMTP call
+    import app.core.email
+
+    async def send(*args, **kwargs):
+        pass
+    app.core.email.send = send
+
+
+def load_app():
+    """app.main:app, wrapped for counting, with SMTP stubbed. DATABASE_URL must be set first."""
+    stub_smtp()
+    from app.database.config import async_engine, engine
+    from app.main import app
+    count_queries(engine, async_engine)
+    return counting_app(app)
+
+
+def seed(products: int, users: int, seed_value: int):
+    from app.database.config import DATABASE_URL
+    from app.scripts.seed_fake_data import load_engine, seed_database
+    engine = load_engine(DATABASE_URL)
+    seed_database(engine, seed_value, products=products, users=users, password=PASSWORD)
+    engine.dispose()
+
+
+def fixtures() -> dict:
+    """What the endpoints need from the database: sizes, categories and an active user."""
+    from sqlalchemy import create_engine, text
+    from app.database.config import DATABASE_URL
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        products = conn.scalar(text("SELECT COUNT(*) FROM products"))
+        users = conn.scalar(text("SELECT COUNT(*) FROM users"))
+        categories = conn.scalars(text("SELECT DISTINCT category FROM products ORDER BY category")).all()
+        email = conn.scalar(text("SELECT email FROM users WHERE is_active ORDER BY id LIMIT 1"))
+    engine.dispose()
+    if not products or not email:
+        raise SystemExit("The database needs products and at least one active user; drop --database to seed one")
+    return {"products": products, "users": users, "categories": categories, "email": email}
+
+
+def percentile(sorted_values: List[float], rank: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    index = max(int(-(-rank * len(sorted_values) // 100)), 1) - 1
+    return sorted_values[index]
+
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, concurrency: int, total: int,
+                       headers: Dict[str, str]) -> dict:
+    """Send `total` requests to one endpoint with `concurrency` in flight."""
+    total = min(total, endpoint.max_requests or total)
+    latencies, queries = [], []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    endpoint.method, endpoint.path(i), json=endpoint.body, headers=headers if endpoint.auth else None,
+                )
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+                if "x-db-queries" in response.headers:
+                    queries.append(int(response.headers["x-db-queries"]))
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint.name,
+        "router": endpoint.router,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed,
+        "mean_ms": sum(latencies) / total * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "db_queries_per_request": sum(queries) / len(queries) if queries else None,
+    }
+
+
+async def run_suite(client: httpx.AsyncClient, selected: List[Endpoint], levels: List[int], total: int,
+                    warmup: int, email: str) -> List[dict]:
+    login = await client.post("/v1/auth/admin/api/login", json={"email": email, "password": PASSWORD})
+    login.raise_for_status()
+    token = login.json()["data"]["jwt"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = []
+    for endpoint in selected:
+        for i in range(warmup):
+            await client.request(endpoint.method, endpoint.path(i), json=endpoint.body, headers=headers)
+        for level in levels:
+            result = await run_endpoint(client, endpoint, level, total, headers)
+            results.append(result)
+            queries = result["db_queries_per_request"]
+            print(f"{result['endpoint']:<32} {level:>4} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                  f"{'-' if queries is None else f'{queries:.1f}':>8} {result['errors']:>6}")
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """A uvicorn worker in its own process, serving the counting app on the same database."""
+    server = subprocess.Popen([sys.executable, "-m", "app.scripts.benchmark", "--serve", str(port)],
+                              env={**os.environ, **(env or {})})
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("uvicorn exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn did not start within 30s")
+
+
+def serve(port: int):
+    import uvicorn
+    from app.database.config import init_db
+    init_db()
+    uvicorn.run(load_app(), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline_path: str, tolerance: float, server: str) -> int:
+    """Print throughput and p95 changes against an earlier run; returns the number of regressions."""
+    with open(baseline_path) as f:
+        previous = json.load(f)
+    baseline = {(entry["endpoint"], entry["concurrency"], entry.get("fast_json")): entry for entry in previous["results"]}
+
+    print(f"\nAgainst {baseline_path} (commit {previous.get('commit')}):")
+    if previous.get("server") != server:
+        print(f"Warning: the baseline ran on {previous.get('server')}, this run on {server}; the numbers are not comparable")
+    regressions = 0
+    for result in results:
+        before = baseline.get((result["endpoint"], result["concurrency"], result.get("fast_json")))
+        if before is None:
+            continue
+        rps_change = result["rps"] / before["rps"] - 1
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        regressed = rps_change < -tolerance or p95_change > tolerance
+        regressions += regressed
+        print(f"{result['endpoint']:<32} {result['concurrency']:>4} req/s {rps_change:+7.1%}  p95 {p95_change:+7.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+async def run_server(args, asgi_app, selected: List[Endpoint], levels: List[int], email: str,
+                     fast_json: Optional[bool]) -> List[dict]:
+    """The suite against the server args ask for, with FAST_JSON_RESPONSES forced on or off unless None."""
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+            return await run_suite(client, selected, levels, args.requests, args.warmup, email)
+
+    if args.server == "uvicorn":
+        port = args.port or free_port()
+        server = start_server(port, None if fast_json is None else {"FAST_JSON_RESPONSES": str(int(fast_json))})
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+                return await run_suite(client, selected, levels, args.requests, args.warmup, email)
+        finally:
+            server.terminate()
+            server.wait()
+
+    if fast_json is not None:
+        # fast_json reads the flag per response, so it can be flipped between runs
+        import app.core.responses as responses
+        responses.FAST_JSON_RESPONSES = fast_json
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        return await run_suite(client, selected, levels, args.requests, args.warmup, email)
+
+
+async def benchmark(args) -> List[dict]:
+    data = fixtures()
+    selected = [
+        endpoint for endpoint in endpoints(data["products"], data["users"], data["categories"], data["email"])
+        if endpoint.router in args.routers and (not args.endpoints or any(re.search(pattern, endpoint.name) for pattern in args.endpoints))
+    ]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    # Loaded once: every load adds another query counter
+    asgi_app = load_app() if args.server == "asgi" and not args.base_url else None
+
+    results = []
+    for fast_json in (False, True) if args.json_modes else (None,):
+        if fast_json is not None:
+            print(f"\nFAST_JSON_RESPONSES={int(fast_json)}")
+        print(f"{'endpoint':<32} {'conc':>4} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>6}")
+        for result in await run_server(args, asgi_app, selected, levels, data["email"], fast_json):
+            results.append(dict(result, fast_json=fast_json))
+
+    if args.json_modes:
+        validated = {(result["endpoint"], result["concurrency"]): result for result in results if not result["fast_json"]}
+        print("\nFast JSON against validated responses:")
+        for result in results:
+            if result["fast_json"]:
+                before = validated[result["endpoint"], result["concurrency"]]
+                print(f"{result['endpoint']:<32} {result['concurrency']:>4} {result['rps'] / before['rps']:.2f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput, latency and queries per request of every router")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="Start from a named set of the options below")
+    parser.add_argument("--server", choices=["asgi", "uvicorn"], default="asgi",
+                        help="In-process ASGI client, or a uvicorn worker over loopback")
+    parser.add_argument("--concurrency", default="1,16", help="Comma-separated levels, each run per endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and level")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint")
+    parser.add_argument("--routers", type=lambda value: value.split(","), default=["products", "fake", "admin", "email"])
+    parser.add_argument("--endpoints", type=lambda value: value.split(","), help="Only endpoints whose name matches one of these regular expressions")
+    parser.add_argument("--database", help="Benchmark this DATABASE_URL as-is instead of seeding a scratch one")
+    parser.add_argument("--products", default="10k", help="Products to seed, e.g. 5000, 100k")
+    parser.add_argument("--users", default="1000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--base-url", help="Benchmark a server that is already running; --database must name its database")
+    parser.add_argument("--json-modes", action="store_true",
+                        help="Run everything twice, with FAST_JSON_RESPONSES off and then on")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.preset:
+        parser.set_defaults(**PRESETS[args.preset])
+        args = parser.parse_args()
+    if args.base_url and (not args.database or args.json_modes):
+        parser.error("--base-url needs --database and can't switch --json-modes")
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    # The app reads DATABASE_URL when it is first imported, so this comes
+    # before anything under app/ is imported, seed_fake_data's count included
+    os.environ["DATABASE_URL"] = args.database or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    from app.scripts.seed_fake_data import count
+    args.products, args.users = count(args.products), count(args.users)
+    if not args.database:
+        seed(args.products, args.users, args.seed)
+
+    results = asyncio.run(benchmark(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "commit": git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "server": args.base_url or args.server,
+                "database": args.database or f"scratch: {args.products} products, {args.users} users, seed {args.seed}",
+                "requests": args.requests,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare and compare(results, args.compare, args.tolerance, args.base_url or args.server):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# app/scripts/calibrate_password_hash.py
+
+import argparse
+import math
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+from app.core.security import PASSWORD_HASH_POLICY, pwd_context
+
+# python -m app.scripts.calibrate_password_hash --budget-ms 50
+# Times each scheme on this host, picks the highest cost whose verify fits the
+# budget and writes the policy that app.core.security loads at startup. Hashes
+# made under the old policy are replaced as their users log in.
+
+SCHEMES = ("pbkdf2_sha256", "bcrypt", "argon2")
+DEFAULT_BUDGET_MS = 50.0
+# Never calibrate below these, however slow the host
+MIN_COST = {"pbkdf2_sha256": 20000, "bcrypt": 10, "argon2": 2}
+PROBE_COST = {"pbkdf2_sha256": 20000, "bcrypt": 10, "argon2": 2}
+PASSWORD = "calibration-password"
+
+
+def verify_ms(handler, cost: int, samples: int) -> float:
+    """Median milliseconds to verify one password hashed at `cost`."""
+    hashed = handler.using(rounds=cost).hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.verify(PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, budget_ms: float, samples: int) -> Optional[dict]:
+    """The highest cost of a scheme that verifies within budget_ms; None when its backend is missing."""
+    handler = get_crypt_handler(scheme)
+    # Only schemes that wrap a C library have backends; pbkdf2_sha256 always runs
+    if hasattr(handler, "has_backend") and not handler.has_backend():
+        return None
+
+    probe = PROBE_COST[scheme]
+    probe_ms = verify_ms(handler, probe, samples)
+    # Time grows linearly with the cost, or doubles per step for log2 costs such as bcrypt's
+    if handler.rounds_cost == "log2":
+        cost = probe + math.floor(math.log2(budget_ms / probe_ms))
+    else:
+        cost = int(probe * budget_ms / probe_ms)
+        cost -= cost % 1000 if cost > 10000 else 0
+    cost = max(min(cost, handler.max_rounds), MIN_COST[scheme], handler.min_rounds)
+
+    # The estimate ignores fixed overhead, so confirm it and step down until it fits
+    measured = verify_ms(handler, cost, samples)
+    while measured > budget_ms and cost > MIN_COST[scheme]:
+        cost = max(cost - 1 if handler.rounds_cost == "log2" else int(cost * 0.9), MIN_COST[scheme])
+        measured = verify_ms(handler, cost, samples)
+    return {"scheme": scheme, "cost": cost, "verify_ms": measured, "within_budget": measured <= budget_ms}
+
+
+def policy(scheme: str, cost: int, current: CryptContext = pwd_context) -> CryptContext:
+    """`scheme` at exactly `cost` for new hashes; every other scheme in use stays verifiable but deprecated.
+
+    Pinning the minimum and maximum to the cost makes needs_update flag hashes
+    at any other cost, so lowering the cost is rolled out on login as well.
+    """
+    schemes = [scheme, *(name for name in current.schemes() if name != scheme)]
+    return CryptContext(schemes=schemes, deprecated="auto", **{
+        f"{scheme}__default_rounds": cost,
+        f"{scheme}__min_rounds": cost,
+        f"{scheme}__max_rounds": cost,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick password hash costs that fit a latency budget on this host")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Target time for one verify")
+    parser.add_argument("--scheme", choices=SCHEMES, default="pbkdf2_sha256", help="Scheme to write the policy for")
+    parser.add_argument("--samples", type=int, default=5, help="Timings per measurement; the median is used")
+    parser.add_argument("--output", default=PASSWORD_HASH_POLICY)
+    parser.add_argument("--dry-run", action="store_true", help="Print the policy instead of writing it")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scheme':<14} {'cost':>8} {'verify ms':>10}")
+    for scheme in SCHEMES:
+        result = calibrate(scheme, args.budget_ms, args.samples)
+        if result is None:
+            print(f"{scheme:<14} {'no backend installed':>19}")
+            continue
+        results[scheme] = result
+        print(f"{scheme:<14} {result['cost']:>8} {result['verify_ms']:>10.1f}"
+              f"{'' if result['within_budget'] else '  over budget at the minimum cost'}")
+
+    chosen = results.get(args.scheme)
+    if chosen is None:
+        raise SystemExit(f"{args.scheme} has no backend installed")
+
+    header = (
+        f"# Written by app.scripts.calibrate_password_hash on {platform.node()} "
+        f"at {datetime.now(timezone.utc):%Y-%m-%d %H:%M} UTC\n"
+        f"# {args.scheme} verifies in {chosen['verify_ms']:.1f} ms here; budget {args.budget_ms:g} ms\n"
+    )
+    content = header + policy(args.scheme, chosen["cost"]).to_string()
+    if args.dry_run:
+        print("\n" + content)
+        return
+    with open(args.output, "w") as f:
+        f.write(content)
+    print(f"\nWrote {args.output}; restart the app to apply it")
+
+
+if __name__ == "__main__":
+    main()
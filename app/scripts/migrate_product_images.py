@@ -0,0 +1,50 @@
+# app/scripts/migrate_product_images.py
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, undefer
+from app.core.blob_store import store_image
+from app.database.config import SessionLocal, engine
+from app.database.models import Product
+from app.database.product_columns import add_product_columns
+
+BATCH_SIZE = 500
+
+
+def migrate_product_images(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """Move legacy inline base64 images into the blob store.
+
+    Rows are visited in id order, one batch after another. Images that are not
+    valid base64 are left inline, untouched, so a re-run after an interruption
+    only finds those and the rows it had not reached yet.
+    """
+    migrated = 0
+    last_id = 0
+    while True:
+        products = db.execute(
+            select(Product)
+            .options(undefer(Product.image))
+            .where(Product.image.isnot(None), Product.id > last_id)
+            .order_by(Product.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not products:
+            return migrated
+
+        for product in products:
+            try:
+                product.image_ref = store_image(product.image)
+            except ValueError:
+                print(f"Skipping product {product.id}: image is not valid base64")
+                continue
+            product.image = None
+            migrated += 1
+        db.commit()
+        last_id = products[-1].id
+
+
+if __name__ == "__main__":
+    # Databases created before image_ref existed need the column first
+    add_product_columns(engine)
+    db = SessionLocal()
+    count = migrate_product_images(db)
+    print(f"Migrated {count} product images")
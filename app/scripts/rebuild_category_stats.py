@@ -0,0 +1,21 @@
+# app/scripts/rebuild_category_stats.py
+
+from app.database.category_stats import init_category_stats, rebuild_category_stats
+from app.database.config import engine
+
+
+def rebuild():
+    """Recompute category_stats from scratch, e.g. after restoring a backup.
+
+    This runs in its own process, so it can't reach a server's response cache:
+    running servers keep serving the stats they cached until the entries
+    expire (PRODUCT_CACHE_TTL_SECONDS) or the server restarts.
+    """
+    init_category_stats(engine)
+    with engine.begin() as conn:
+        rebuild_category_stats(conn)
+
+
+if __name__ == "__main__":
+    rebuild()
+    print("Rebuilt category stats")
@@ -0,0 +1,234 @@
+# app/scripts/seed_fake_data.py
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from sqlalchemy import create_engine, event, func, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.core.fake_data import FakeDataConfig, fake_otp, fake_product, fake_user, fake_user_log, np, product_block, user_block
+from app.database.category_stats import rebuild_category_stats
+from app.database.config import DATABASE_URL, init_db
+from app.database.models import OTP, Product, User, UserLog
+
+# python -m app.scripts.seed_fake_data --products 1M --users 100k --user-logs 2M --otps 100k --seed 7
+# Loads into DATABASE_URL. Meant for scratch load-test databases: writes are
+# unjournaled while it runs, so an interrupted load can leave the file unusable.
+
+CHUNK_SIZE = 20000
+
+# Trade durability for speed while loading; they only apply to the loader's own connections
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+]
+
+TABLES = {
+    "products": Product.__table__,
+    "users": User.__table__,
+    "user_logs": UserLog.__table__,
+    "otps": OTP.__table__,
+}
+
+
+def count(value: str) -> int:
+    """Row counts such as 5000, 100k or 10M."""
+    multiplier = {"k": 1000, "m": 1000000}.get(value[-1:].lower(), 1)
+    return int(float(value[:-1] if multiplier > 1 else value) * multiplier)
+
+
+def load_engine(url: str = DATABASE_URL) -> Engine:
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def tune(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            for pragma in LOAD_PRAGMAS:
+                cursor.execute(pragma)
+            cursor.close()
+    return engine
+
+
+def generate_rows(kind: str, bounds, *, seed: int, config: FakeDataConfig, id_offset: int, users: int,
+                  user_offset: int, hashed_password: str) -> list:
+    """Rows start <= k < stop of one table. Runs in the worker processes."""
+    start, stop = bounds
+    if kind == "products" and np is not None:
+        rows = product_block(seed, start, stop, config)
+    elif kind == "users" and np is not None:
+        rows = user_block(seed, start, stop, hashed_password)
+    elif kind == "products":
+        rows = [fake_product(seed, k, config) for k in range(start, stop)]
+    elif kind == "users":
+        rows = [fake_user(seed, k, hashed_password) for k in range(start, stop)]
+    elif kind == "user_logs":
+        rows = [fake_user_log(seed, k, users) for k in range(start, stop)]
+        for row in rows:
+            row["user_id"] += user_offset + 1
+    else:
+        rows = [fake_otp(seed, k, users) for k in range(start, stop)]
+    # Explicit ids keep a load contiguous, so its rows are "id > id_offset"
+    for k, row in enumerate(rows, start):
+        row["id"] = id_offset + k + 1
+    return rows
+
+
+def generate_chunks(generate, total: int, chunk_size: int, workers: int):
+    """Chunks of rows in order, generated up to 2 * workers chunks ahead of the writer."""
+    bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    if workers <= 1:
+        yield from map(generate, bounds)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in bounds:
+            pending.append(pool.submit(generate, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+@contextmanager
+def load_mode(conn: Connection, table_name: str, drop_indexes: bool):
+    """Drop a table's triggers, and optionally its non-unique indexes, for a bulk load.
+
+    Per-row trigger work on products (search index, category stats, change log)
+    would cost more than the insert itself; catch_up_product_tables does it in
+    bulk afterwards. Building an index once over a freshly loaded table is
+    cheaper than updating it row by row. Everything is restored on exit.
+    """
+    schema = conn.execute(text(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = :table AND sql IS NOT NULL "
+        "AND (type = 'trigger' OR (type = 'index' AND sql NOT LIKE 'CREATE UNIQUE%'))"
+    ), {"table": table_name}).all()
+    if not drop_indexes:
+        schema = [entry for entry in schema if entry.type == "trigger"]
+    for entry in schema:
+        conn.execute(text(f'DROP {entry.type.upper()} "{entry.name}"'))
+    conn.commit()
+    try:
+        yield
+    finally:
+        # Indexes first, so restored triggers can use them
+        for entry in sorted(schema, key=lambda entry: entry.type != "index"):
+            conn.execute(text(entry.sql))
+        conn.commit()
+
+
+def catch_up_product_tables(conn: Connection, id_offset: int, loaded: int):
+    """What the suspended triggers would have written for products with id > id_offset."""
+    tables = set(inspect(conn).get_table_names())
+    params = {"offset": id_offset}
+    if "products_fts" in tables:
+        conn.execute(text(
+            "INSERT INTO products_fts(rowid, title, description, brand, model) "
+            "SELECT id, title, description, brand, model FROM products WHERE id > :offset"
+        ), params)
+    if "category_stats" in tables:
+        rebuild_category_stats(conn)
+    if "product_changes" in tables:
+        seq = conn.scalar(text("SELECT COALESCE(MAX(seq), 0) FROM product_changes"))
+        conn.execute(text(
+            "INSERT OR REPLACE INTO product_changes(product_id, seq, deleted, changed_at) "
+            "SELECT id, :seq + id - :offset, 0, CURRENT_TIMESTAMP FROM products WHERE id > :offset"
+        ), dict(params, seq=seq))
+    if "catalog_state" in tables:
+        conn.execute(text(
+            "UPDATE catalog_state SET generation = generation + :loaded, updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+        ), {"loaded": loaded})
+    conn.commit()
+
+
+def load_table(engine: Engine, kind: str, total: int, workers: int, chunk_size: int = CHUNK_SIZE, **options) -> int:
+    """Generate and insert `total` rows of one table; returns the id offset they start after."""
+    table = TABLES[kind]
+    with engine.connect() as conn:
+        id_offset = conn.scalar(select(func.coalesce(func.max(table.c.id), 0)))
+
+    generate = partial(generate_rows, kind, id_offset=id_offset, **options)
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        sqlite = engine.dialect.name == "sqlite"
+        # Indexes are only rebuilt from scratch when the load is the whole table
+        with load_mode(conn, table.name, drop_indexes=id_offset == 0) if sqlite else nullcontext():
+            for rows in generate_chunks(generate, total, chunk_size, workers):
+                conn.execute(insert(table), rows)
+                conn.commit()
+        if sqlite and kind == "products":
+            catch_up_product_tables(conn, id_offset, total)
+
+    elapsed = time.perf_counter() - started
+    print(f"{kind}: {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+    return id_offset
+
+
+def seed_database(engine: Engine, seed: int, products: int = 0, users: int = 0, user_logs: int = 0, otps: int = 0,
+                  config: FakeDataConfig = FakeDataConfig(), workers: int = 1, chunk_size: int = CHUNK_SIZE,
+                  password: str = "password"):
+    """Load a reproducible dataset: the same seed and counts give the same rows."""
+    if (user_logs or otps) and not users:
+        raise ValueError("User logs and OTPs belong to generated users; pass a user count")
+
+    init_db(engine)
+    hashed_password = ""
+    if users:
+        from app.core.security import get_password_hash
+        # One hash shared by every user; hashing per row would dominate the load
+        hashed_password = get_password_hash(password)
+
+    options = dict(seed=seed, config=config, users=users, user_offset=0, hashed_password=hashed_password)
+    if products:
+        load_table(engine, "products", products, workers, chunk_size, **options)
+    if users:
+        options["user_offset"] = load_table(engine, "users", users, workers, chunk_size, **options)
+    if user_logs:
+        load_table(engine, "user_logs", user_logs, workers, chunk_size, **options)
+    if otps:
+        load_table(engine, "otps", otps, workers, chunk_size, **options)
+
+
+def main():
+    defaults = FakeDataConfig()
+    parser = argparse.ArgumentParser(description="Load a seed-reproducible fake dataset into DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=count, default=0)
+    parser.add_argument("--users", type=count, default=0)
+    parser.add_argument("--user-logs", type=count, default=0)
+    parser.add_argument("--otps", type=count, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--password", default="password", help="Password of every generated user")
+    parser.add_argument("--category-skew", type=float, default=defaults.category_skew)
+    parser.add_argument("--price-median", type=float, default=defaults.price_median)
+    parser.add_argument("--price-sigma", type=float, default=defaults.price_sigma)
+    parser.add_argument("--rating-mean", type=float, default=defaults.rating_mean)
+    parser.add_argument("--rating-sd", type=float, default=defaults.rating_sd)
+    parser.add_argument("--discount-share", type=float, default=defaults.discount_share)
+    parser.add_argument("--out-of-stock-share", type=float, default=defaults.out_of_stock_share)
+    args = parser.parse_args()
+
+    config = FakeDataConfig(
+        category_skew=args.category_skew,
+        price_median=args.price_median,
+        price_sigma=args.price_sigma,
+        rating_mean=args.rating_mean,
+        rating_sd=args.rating_sd,
+        discount_share=args.discount_share,
+        out_of_stock_share=args.out_of_stock_share,
+    )
+    seed_database(
+        load_engine(), args.seed,
+        products=args.products, users=args.users, user_logs=args.user_logs, otps=args.otps,
+        config=config, workers=args.workers, chunk_size=args.chunk_size, password=args.password,
+    )
+
+
+if __name__ == "__main__":
+    main()
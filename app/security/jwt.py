@@ -2,9 +2,10 @@
 
 from fastapi import HTTPException, Header, status, Depends
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.models import BlacklistedToken  # Use BlacklistedToken
-from app.database.config import get_db
+from app.database.config import get_async_db
 import os
 from datetime import datetime, timedelta
 
@@ -17,10 +18,10 @@ def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def is_token_blacklisted(token: str, db: Session) -> bool:
-    return db.query(BlacklistedToken).filter_by(token=token).first() is not None
+async def is_token_blacklisted(token: str, db: AsyncSession) -> bool:
+    return await db.scalar(select(BlacklistedToken).filter_by(token=token)) is not None
 
-def validate_token(authorization: str = Header(None), db: Session = Depends(get_db)) -> str:
+async def validate_token(authorization: str = Header(None), db: AsyncSession = Depends(get_async_db)) -> str:
     if not authorization:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     
@@ -29,7 +30,7 @@ def validate_token(authorization: str = Header(None), db: Session = Depends(get_
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token format")
 
-    if is_token_blacklisted(token, db):
+    if await is_token_blacklisted(token, db):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been invalidated")
 
     try:
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database and blob store before it is imported
+_tmp_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_tmp_dir, "test_jazzyapi.db")
+os.environ["BLOB_STORE_DIR"] = os.path.join(_tmp_dir, "blobs")
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from app.database.config import async_engine, init_db
+from app.main import app
+from app.scripts.benchmark import Endpoint, count_queries, counting_app, percentile, run_endpoint
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_run_endpoint_reports_latency_and_queries_per_request():
+    init_db()
+    count_queries(async_engine)
+    endpoint = Endpoint("GET /product/{id}", "products", "GET", lambda i: f"/v1/products/api/product/{i + 1}")
+
+    async def run():
+        transport = httpx.ASGITransport(app=counting_app(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run_endpoint(client, endpoint, concurrency=3, total=12, headers={})
+
+    result = asyncio.run(run())
+    assert (result["requests"], result["concurrency"]) == (12, 3)
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    # Every id is read once, so each request misses the response cache and queries
+    assert result["db_queries_per_request"] >= 1
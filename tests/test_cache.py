@@ -0,0 +1,29 @@
+from app.core.cache import ResponseCache
+
+
+def test_evicts_least_recently_used_and_expires_by_ttl():
+    now = [0.0]
+    cache = ResponseCache(max_entries=2, max_bytes=1024, ttl=10, clock=lambda: now[0])
+    cache.set(("a",), b"1")
+    cache.set(("b",), b"2")
+    assert cache.get(("a",)) == b"1"
+    cache.set(("c",), b"3")
+
+    assert cache.get(("b",)) is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] = 11
+    assert cache.get(("a",)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_prefix_drops_the_whole_family():
+    cache = ResponseCache()
+    cache.set(("category", "x", None, 10), b"page 1")
+    cache.set(("category", "x", "cursor", 10), b"page 2")
+    cache.set(("category", "y", None, 10), b"other")
+
+    cache.invalidate_prefix(("category", "x"))
+    assert cache.get(("category", "x", None, 10)) is None
+    assert cache.get(("category", "x", "cursor", 10)) is None
+    assert cache.get(("category", "y", None, 10)) == b"other"
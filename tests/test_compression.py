@@ -0,0 +1,84 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+from app.core.cache import ResponseCache
+from app.core.compression import CompressionMiddleware, negotiate, zstandard
+
+BODY = b'{"data": "' + b"x" * 4000 + b'"}'
+
+
+def make_app(cache=None):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, cache=cache)
+
+    @app.get("/big")
+    def big():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b'{"n": %d}\n' % i for i in range(100)), media_type="application/x-ndjson")
+
+    return app
+
+
+def make_client(cache=None):
+    return TestClient(make_app(cache))
+
+
+def test_negotiate_honours_q_values_and_preference_order():
+    assert negotiate("gzip, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ["br", "gzip"]) == "gzip"
+    assert negotiate("*;q=0.1, gzip;q=0", ["gzip"]) is None
+    assert negotiate("identity", ["gzip"]) is None
+
+
+def test_large_bodies_are_compressed_and_small_ones_are_not():
+    client = make_client()
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.content == BODY
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streaming_bodies_are_compressed_incrementally():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert response.text.count("\n") == 100
+
+
+def test_compressed_bodies_are_cached_by_etag():
+    cache = ResponseCache()
+    client = make_client(cache)
+    for _ in range(3):
+        client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 2)
+    cached = cache.get(("compressed", '"v1"', "gzip", len(BODY)))
+    assert gzip.decompress(cached) == BODY
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")
+def test_concurrent_zstd_streams_do_not_share_a_context():
+    async def fetch_all():
+        transport = httpx.ASGITransport(app=make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/stream", headers={"Accept-Encoding": "zstd"}) for _ in range(4)))
+
+    for response in asyncio.run(fetch_all()):
+        assert response.headers["Content-Encoding"] == "zstd"
+        assert response.text.count("\n") == 100
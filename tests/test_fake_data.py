@@ -0,0 +1,73 @@
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.fake_data import FakeDataConfig, fake_order, fake_product, fake_user, order_block, product_block, user_block
+from app.main import app
+from app.scripts.seed_fake_data import count, load_engine, seed_database
+
+
+def test_records_depend_only_on_seed_and_index():
+    assert fake_product(7, 123) == fake_product(7, 123)
+    assert fake_product(7, 123) != fake_product(8, 123)
+    assert [fake_product(7, k)["title"] for k in (3, 1, 2)] == [fake_product(7, k)["title"] for k in (3, 1, 2)]
+    assert fake_user(7, 5, "hash")["email"] != fake_user(7, 6, "hash")["email"]
+
+    # A strong skew puts most products in the first category
+    skewed = [fake_product(1, k, FakeDataConfig(category_skew=3.0))["category"] for k in range(500)]
+    assert skewed.count("smartphones") > 350
+    assert count("10M") == 10000000 and count("2.5k") == 2500 and count("17") == 17
+
+
+def test_seed_database_loads_rows_and_catches_up_derived_tables(tmp_path):
+    engine = load_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    seed_database(engine, seed=3, products=250, users=20, user_logs=40, otps=10, chunk_size=100)
+
+    with engine.connect() as conn:
+        def scalar(sql):
+            return conn.execute(text(sql)).scalar()
+
+        assert scalar("SELECT COUNT(*) FROM products") == 250
+        assert scalar("SELECT SUM(product_count) FROM category_stats") == 250
+        assert scalar("SELECT COUNT(*) FROM product_changes") == 250
+        assert scalar("SELECT COUNT(*) FROM user_logs WHERE user_id NOT IN (SELECT id FROM users)") == 0
+        assert scalar("SELECT COUNT(*) FROM otp WHERE email NOT IN (SELECT email FROM users)") == 0
+        title = scalar("SELECT title FROM products WHERE id = 1")
+        assert title == fake_product(3, 0)["title"]
+        assert scalar(f"SELECT COUNT(*) FROM products_fts WHERE products_fts MATCH '\"{title.split()[-1]}\"'") > 0
+        # Triggers and indexes dropped for the load are back
+        assert scalar("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'products'") == 12
+        assert scalar("SELECT COUNT(*) FROM sqlite_master WHERE name = 'ix_products_category_price'") == 1
+
+
+def test_vectorized_blocks_match_record_functions():
+    config = FakeDataConfig(category_skew=2.0, discount_share=0.5)
+    assert product_block(5, 100, 600, config) == [fake_product(5, k, config) for k in range(100, 600)]
+    assert user_block(5, 0, 500, "hash") == [fake_user(5, k, "hash") for k in range(500)]
+    assert order_block(5, 30, 530, 200, 40) == [fake_order(5, k, 200, 40) for k in range(30, 530)]
+
+    order = fake_order(5, 0, 200, 40)
+    assert 1 <= len(order["items"]) <= 5 and 1 <= order["user_id"] <= 40
+    assert order["items"][0]["unit_price"] == fake_product(5, order["items"][0]["product_id"] - 1)["price"]
+
+
+def test_fake_endpoint_streams_and_continues():
+    client = TestClient(app)
+    response = client.get("/v1/fake/products?seed=9&count=2500")
+    assert response.status_code == 200
+    assert response.headers["X-Next-Start"] == "2500"
+    products = response.json()
+    assert len(products) == 2500 and products[0]["id"] == 1
+    assert products[0]["title"] == fake_product(9, 0)["title"]
+    assert products[0]["rating"]["rate"] == fake_product(9, 0)["rating_rate"]
+
+    # Continuing from X-Next-Start picks up exactly where a larger request would be
+    continued = client.get("/v1/fake/products?seed=9&count=500&start=2000&format=ndjson")
+    assert continued.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in continued.text.splitlines()] == products[2000:]
+
+    users = client.get("/v1/fake/users?count=3", headers={"Accept": "application/x-ndjson"}).text.splitlines()
+    assert len(users) == 3 and "hashed_password" not in json.loads(users[0])
+    assert client.get("/v1/fake/orders?count=0").json() == []
+    assert client.get("/v1/fake/invoices").status_code == 404
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+import app.core.security as security
+from app.core.hashing import PasswordHasher
+from app.core.security import create_access_token, get_password_hash, verify_password
+from app.database.config import SessionLocal
+from app.database.models import User
+from app.main import app
+from app.scripts.calibrate_password_hash import calibrate, policy
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    hasher = PasswordHasher(workers=1, max_queue=1, kind="thread", retry_after=3)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.create_task(hasher.run(release.wait))
+        queued = asyncio.create_task(hasher.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert (hasher.stats()["in_flight"], hasher.stats()["queue_depth"]) == (1, 1)
+
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.run(release.wait)
+        release.set()
+        return rejected.value, await running, await queued
+
+    rejected, *results = asyncio.run(run())
+    assert rejected.status_code == 503 and rejected.headers["Retry-After"] == "3"
+    assert results == [True, True]
+
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["queue_depth"]) == (2, 1, 0)
+    assert stats["hash_latency"]["p50_ms"] > 0
+    hasher.shutdown()
+
+
+def test_passwords_hash_on_the_pool_and_stats_are_served():
+    hasher = PasswordHasher(workers=2, max_queue=0, kind="thread")
+
+    async def run():
+        hashed = await hasher.run(get_password_hash, "secret")
+        return await hasher.run(verify_password, "secret", hashed)
+
+    assert asyncio.run(run()) is True
+    hasher.shutdown()
+
+    with TestClient(app) as client:
+        with SessionLocal() as db:
+            db.add(User(full_name="Stats", email="stats@example.com", hashed_password=get_password_hash("secret"), is_active=True))
+            db.commit()
+        url = "/v1/auth/admin/api/hashing/stats"
+        assert client.get(url).status_code == 401
+        token = create_access_token({"sub": "stats@example.com"})
+        stats = client.get(url, headers={"Authorization": f"Bearer {token}"}).json()
+    assert {"workers", "queue_depth", "rejected", "hash_latency"} <= set(stats)
+
+
+def test_calibration_fits_the_budget_or_stops_at_the_floor():
+    result = calibrate("pbkdf2_sha256", budget_ms=5, samples=1)
+    assert result["cost"] >= 20000
+    assert result["within_budget"] or result["cost"] == 20000
+
+
+def test_login_rehashes_passwords_made_under_an_older_policy(monkeypatch):
+    old = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=20000)
+    with TestClient(app) as client:
+        with SessionLocal() as db:
+            db.add(User(full_name="Rehash", email="rehash@example.com", hashed_password=old.hash("secret"), is_active=True))
+            db.commit()
+
+        current = policy("pbkdf2_sha256", 21000, current=old)
+        monkeypatch.setattr(security, "pwd_context", current)
+        assert current.needs_update(old.hash("secret"))
+
+        for _ in range(2):
+            response = client.post("/v1/auth/admin/api/login", json={"email": "rehash@example.com", "password": "secret"})
+            assert response.status_code == 200
+            with SessionLocal() as db:
+                stored = db.query(User).filter_by(email="rehash@example.com").one().hashed_password
+            assert stored.startswith("$pbkdf2-sha256$21000$") and not current.needs_update(stored)
+
+        wrong = client.post("/v1/auth/admin/api/login", json={"email": "rehash@example.com", "password": "wrong"})
+        assert wrong.status_code == 401
@@ -0,0 +1,470 @@
+import base64
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core.security import create_access_token
+from app.database.config import SessionLocal
+from app.database.models import User
+from app.main import app
+
+PREFIX = "/v1/products/api"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def make_product(client, **overrides):
+    product = {
+        "title": "Test product",
+        "price": 10.0,
+        "description": "A product created by the test suite",
+        "category": "test",
+    }
+    product.update(overrides)
+    response = client.post(f"{PREFIX}/add/product", json=product)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+
+def collect_pages(client, url, **params):
+    items, cursor = [], None
+    while True:
+        query = dict(params, cursor=cursor) if cursor else params
+        response = client.get(url, params=query)
+        assert response.status_code == 200
+        body = response.json()
+        items.extend(body["data"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_category_pages_follow_cursor(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    created = [make_product(client, title=f"Item {i}", category=category) for i in range(5)]
+
+    first = client.get(f"{PREFIX}/category/{category}", params={"page_size": 2}).json()
+    assert len(first["data"]) == 2
+    assert first["next_cursor"]
+
+    items = collect_pages(client, f"{PREFIX}/category/{category}", page_size=2)
+    assert [item["id"] for item in items] == [product["id"] for product in created]
+
+
+def test_sorted_pages_keep_nulls_last_when_descending(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    ids = []
+    for rate in (4.5, None, 3.0, 4.5, None):
+        rating = {"rate": rate, "count": 1} if rate is not None else None
+        ids.append(make_product(client, category=category, rating=rating)["id"])
+
+    items = collect_pages(client, f"{PREFIX}/sorted", sort_by="rating_rate", order="desc", page_size=2)
+    ours = [item["id"] for item in items if item["category"] == category]
+    # Ties and NULLs are ordered by id in the same direction as the sort column
+    assert ours == [ids[3], ids[0], ids[2], ids[4], ids[1]]
+    assert len({item["id"] for item in items}) == len(items)
+
+
+def test_sort_orders_by_several_keys_across_pages(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    specs = [(4.0, 20.0), (5.0, 30.0), (4.0, 10.0), (None, 5.0), (5.0, 30.0)]
+    ids = []
+    for rate, price in specs:
+        rating = {"rate": rate, "count": 1} if rate is not None else None
+        ids.append(make_product(client, category=category, rating=rating, price=price)["id"])
+
+    items = collect_pages(client, f"{PREFIX}/sorted", sort="-rating_rate,price", page_size=2)
+    ours = [item["id"] for item in items if item["category"] == category]
+    # Equal keys fall back to id, descending like the first key
+    assert ours == [ids[4], ids[1], ids[2], ids[0], ids[3]]
+
+    assert client.get(f"{PREFIX}/sorted", params={"sort": "description"}).status_code == 400
+    assert client.get(f"{PREFIX}/sorted", params={"sort": "price,price"}).status_code == 400
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get(f"{PREFIX}/all/products", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_stream_returns_every_product_as_ndjson(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    created = [make_product(client, category=category)["id"] for _ in range(3)]
+
+    response = client.get(f"{PREFIX}/all/products", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows if row["category"] == category] == created
+
+
+def test_images_are_deduplicated_and_served_from_the_blob_store(client):
+    image = b"\x89PNG\r\n\x1a\n" + uuid.uuid4().bytes * 4
+    encoded = base64.b64encode(image).decode()
+    first = make_product(client, image=encoded)
+    second = make_product(client, image=encoded)
+    assert first["image_ref"] == second["image_ref"]
+    assert "image" not in first
+
+    url = f"{PREFIX}/images/{first['image_ref']}"
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.content == image
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    assert client.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    partial = client.get(url, headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == image[:8]
+
+
+# products as created before image_ref, version and updated_at existed
+LEGACY_PRODUCTS_DDL = """
+    CREATE TABLE products (
+        id INTEGER PRIMARY KEY, title VARCHAR, price FLOAT, description TEXT, brand VARCHAR,
+        model VARCHAR, color VARCHAR, category VARCHAR, image VARCHAR, discountPercentage FLOAT,
+        stockQuantity INTEGER, rating_rate FLOAT, rating_count INTEGER, availabilityStatus VARCHAR
+    )
+"""
+
+
+def test_image_migration_upgrades_old_tables_and_keeps_invalid_images(tmp_path):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+    from app.database.product_columns import add_product_columns
+    from app.scripts.migrate_product_images import migrate_product_images
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    image = base64.b64encode(b"\x89PNG\r\n\x1a\n" + uuid.uuid4().bytes).decode()
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_PRODUCTS_DDL))
+        conn.execute(text("INSERT INTO products (id, title, image) VALUES (1, 'valid', :image), (2, 'invalid', '%%%'), (3, 'none', NULL)"), {"image": image})
+
+    add_product_columns(engine)
+    add_product_columns(engine)
+    with Session(engine) as db:
+        assert migrate_product_images(db, batch_size=1) == 1
+        assert migrate_product_images(db, batch_size=1) == 0
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, image, image_ref, version FROM products ORDER BY id")).all()
+    assert rows[0].image is None and rows[0].image_ref
+    # Existing rows start at version 1 and the migration's update bumped it
+    assert [row.version for row in rows] == [2, 1, 1]
+    assert (rows[1].image, rows[1].image_ref) == ("%%%", None)
+
+
+def test_search_ranks_title_matches_and_supports_prefixes(client):
+    word = f"zq{uuid.uuid4().hex[:8]}"
+    in_description = make_product(client, title="Plain", description=f"mentions {word} once")["id"]
+    in_title = make_product(client, title=f"{word} deluxe")["id"]
+
+    items = collect_pages(client, f"{PREFIX}/search", q=f"{word[:6]}*", page_size=1)
+    assert [item["id"] for item in items] == [in_title, in_description]
+
+    assert client.delete(f"{PREFIX}/delete/{in_description}").status_code == 200
+    items = client.get(f"{PREFIX}/search", params={"q": word}).json()["data"]
+    assert [item["id"] for item in items] == [in_title]
+
+
+def test_query_filters_and_counts_facets(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    make_product(client, category=category, brand="Acme", price=5.0, stockQuantity=0)
+    cheap = make_product(client, category=category, brand="Acme", price=15.0, stockQuantity=3)["id"]
+    make_product(client, category=category, brand="Globex", price=25.0, stockQuantity=3)
+
+    body = client.get(f"{PREFIX}/query", params={
+        "category": category, "brand": "Acme", "price_min": 10, "in_stock": True, "facets": True,
+    }).json()
+    assert [item["id"] for item in body["data"]] == [cheap]
+    # The brand facet ignores the brand filter itself
+    assert body["facets"]["brand"] == {"Acme": 1, "Globex": 1}
+    assert body["facets"]["category"] == {category: 1}
+
+
+def test_product_reads_are_cached_until_the_product_changes(client):
+    product_id = make_product(client, title="Cached")["id"]
+    url = f"{PREFIX}/product/{product_id}"
+
+    assert client.get(f"{PREFIX}/cache/stats").status_code == 401
+    with SessionLocal() as db:
+        db.add(User(full_name="Cache", email="cache-stats@example.com", hashed_password="unused", is_active=True))
+        db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'cache-stats@example.com'})}"}
+
+    assert client.get(url).json()["data"]["title"] == "Cached"
+    hits = client.get(f"{PREFIX}/cache/stats", headers=headers).json()["hits"]
+    assert client.get(url).json()["data"]["title"] == "Cached"
+    assert client.get(f"{PREFIX}/cache/stats", headers=headers).json()["hits"] == hits + 1
+
+    assert client.put(f"{PREFIX}/update/{product_id}", json={"title": "Renamed"}).status_code == 200
+    assert client.get(url).json()["data"]["title"] == "Renamed"
+
+    assert client.delete(f"{PREFIX}/delete/{product_id}").status_code == 200
+    assert client.get(url).status_code == 404
+
+
+def test_bulk_import_reports_bad_rows_and_inserts_the_rest(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    csv_body = (
+        "title,price,description,category,rating_rate,rating_count\n"
+        f"Lamp,12.5,Desk lamp,{category},4.5,10\n"
+        f"Broken,not-a-price,Bad row,{category},,\n"
+        f"Chair,40,Office chair,{category},,\n"
+    )
+    response = client.post(f"{PREFIX}/bulk", content=csv_body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    result = response.json()["data"]
+    assert (result["received"], result["inserted"], result["failed"]) == (3, 2, 1)
+    assert result["errors"][0]["row"] == 3
+
+    ndjson_body = json.dumps({"title": "Desk", "price": 99, "description": "Oak", "category": category}) + "\n{oops\n"
+    response = client.post(f"{PREFIX}/bulk", params={"format": "ndjson"}, content=ndjson_body)
+    assert response.json()["data"]["inserted"] == 1
+    assert response.json()["data"]["errors"][0]["row"] == 2
+
+    titles = [item["title"] for item in collect_pages(client, f"{PREFIX}/category/{category}")]
+    assert titles == ["Lamp", "Chair", "Desk"]
+
+
+def test_bulk_import_catches_up_what_the_triggers_maintain(client):
+    from sqlalchemy import text
+
+    category = f"cat-{uuid.uuid4().hex}"
+    since = (collect_changes(client, 0, page_size=500) or [{"seq": 0}])[-1]["seq"]
+    rows = [{"title": f"Bulkloaded {n}", "price": n, "description": "Imported", "category": category} for n in (5, 20)]
+    body = "".join(json.dumps(row) + "\n" for row in rows)
+    assert client.post(f"{PREFIX}/bulk", params={"format": "ndjson"}, content=body).json()["data"]["inserted"] == 2
+
+    stats = next(entry for entry in client.get(f"{PREFIX}/categories").json()["stats"] if entry["category"] == category)
+    assert (stats["product_count"], stats["min_price"], stats["max_price"]) == (2, 5.0, 20.0)
+    found = client.get(f"{PREFIX}/search", params={"q": "bulkloaded"}).json()["data"]
+    assert sorted(item["title"] for item in found) == ["Bulkloaded 20", "Bulkloaded 5"]
+    changes = collect_changes(client, since, page_size=500)
+    assert [change["product"]["title"] for change in changes] == ["Bulkloaded 5", "Bulkloaded 20"]
+
+    # The suspended triggers are back for later writes
+    with SessionLocal() as db:
+        assert db.scalar(text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%\\_ai' ESCAPE '\\'")) == 4
+
+
+def test_patch_updates_only_supplied_fields_including_rating(client):
+    created = make_product(client, title="Before", price=10.0, rating={"rate": 3.0, "count": 2})
+
+    response = client.patch(f"{PREFIX}/{created['id']}", json={"price": 12.5, "rating": {"rate": 4.0}})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert (data["title"], data["price"]) == ("Before", 12.5)
+    assert data["rating"] == {"rate": 4.0, "count": 2}
+
+    assert client.get(f"{PREFIX}/product/{created['id']}").json()["data"]["price"] == 12.5
+    assert client.patch(f"{PREFIX}/999999999", json={"price": 1}).status_code == 404
+    # Only numeric ids match the PATCH route, so unknown GET paths are not 405
+    assert client.get(f"{PREFIX}/no-such-route").status_code == 404
+
+
+def test_batch_preserves_order_and_reports_missing_ids(client):
+    first = make_product(client, title="First")["id"]
+    second = make_product(client, title="Second")["id"]
+    client.get(f"{PREFIX}/product/{second}")  # One id comes from the cache
+
+    body = client.get(f"{PREFIX}/batch", params={"ids": f"{second},999999999,{first},{second}"}).json()
+    assert [item["id"] for item in body["data"]] == [second, first]
+    assert body["missing"] == [999999999]
+
+    body = client.post(f"{PREFIX}/batch", json={"ids": [first]}).json()
+    assert [item["title"] for item in body["data"]] == ["First"]
+    assert client.post(f"{PREFIX}/batch", json={"ids": list(range(501))}).status_code == 400
+
+
+def test_fields_limits_the_returned_keys(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    created = make_product(client, title="Sparse", category=category, rating={"rate": 4.0, "count": 3})
+    params = {"fields": "id,title,rating"}
+
+    data = client.get(f"{PREFIX}/product/{created['id']}", params=params).json()["data"]
+    assert data == {"id": created["id"], "title": "Sparse", "rating": {"rate": 4.0, "count": 3}}
+
+    items = client.get(f"{PREFIX}/category/{category}", params=params).json()["data"]
+    assert [set(item) for item in items] == [{"id", "title", "rating"}]
+    # Sort keys are loaded for the cursor even when they aren't returned
+    body = client.get(f"{PREFIX}/sorted", params={"sort_by": "price", "fields": "title", "page_size": 1}).json()
+    assert set(body["data"][0]) == {"title"} and body["next_cursor"]
+
+    body = client.get(f"{PREFIX}/batch", params={"ids": str(created["id"]), "fields": "price"}).json()
+    assert body["data"] == [{"price": 10.0}]
+
+    assert client.get(f"{PREFIX}/product/{created['id']}").json()["data"]["description"]
+    assert client.get(f"{PREFIX}/limited", params={"fields": "id,secret"}).status_code == 400
+
+
+def test_categories_report_maintained_stats(client):
+    category = f"cat-{uuid.uuid4().hex}"
+    cheap = make_product(client, category=category, price=5.0, stockQuantity=0)
+    make_product(client, category=category, price=15.0, stockQuantity=3)
+
+    def stats():
+        body = client.get(f"{PREFIX}/categories").json()
+        assert body["data"] == [entry["category"] for entry in body["stats"]]
+        return next((entry for entry in body["stats"] if entry["category"] == category), None)
+
+    assert stats() == {
+        "category": category, "product_count": 2, "min_price": 5.0,
+        "max_price": 15.0, "avg_price": 10.0, "in_stock_count": 1,
+    }
+
+    client.patch(f"{PREFIX}/{cheap['id']}", json={"price": 25.0, "stockQuantity": 1})
+    assert (stats()["min_price"], stats()["max_price"], stats()["in_stock_count"]) == (15.0, 25.0, 2)
+
+    client.patch(f"{PREFIX}/{cheap['id']}", json={"category": f"{category}-moved"})
+    assert stats()["product_count"] == 1
+    client.delete(f"{PREFIX}/delete/{cheap['id']}")
+    assert stats()["avg_price"] == 15.0
+
+
+def test_conditional_gets_answer_304_until_a_write(client):
+    created = make_product(client, title="Cached")
+    url = f"{PREFIX}/product/{created['id']}"
+
+    first = client.get(url)
+    etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get(url, params={"fields": "id"}, headers={"If-None-Match": etag}).status_code == 200
+
+    listing = client.get(f"{PREFIX}/all/products")
+    assert client.get(f"{PREFIX}/all/products", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+
+    client.patch(f"{PREFIX}/{created['id']}", json={"price": 11.0})
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 200 and again.headers["ETag"] != etag
+    assert client.get(f"{PREFIX}/all/products", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 200
+
+
+def test_cached_bodies_keep_the_etag_they_were_read_at(client):
+    from sqlalchemy import text
+    from app.api.products.cache import product_cache
+
+    created = make_product(client, title="Before", category="etag-test")
+    urls = [f"{PREFIX}/product/{created['id']}", f"{PREFIX}/categories", f"{PREFIX}/category/etag-test"]
+    first = [client.get(url) for url in urls]
+
+    # A write from another process reaches the database but not this process's cache
+    with SessionLocal() as db:
+        db.execute(text("UPDATE products SET title = 'After', version = version + 1 WHERE id = :id"), {"id": created["id"]})
+        db.commit()
+    for url, response in zip(urls, first):
+        again = client.get(url)
+        assert (again.headers["ETag"], again.content) == (response.headers["ETag"], response.content)
+
+    # Once the entries are dropped, the new body comes with a new ETag, so a stale client is not told 304
+    product_cache.clear()
+    for url, response in zip(urls, first):
+        again = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        assert again.status_code == 200 and again.headers["ETag"] != response.headers["ETag"]
+    assert client.get(urls[0]).json()["data"]["title"] == "After"
+
+
+def test_snapshot_answers_sorts_and_queries_like_the_database(client, monkeypatch):
+    from app.api.products.snapshot import np, product_snapshot
+    if np is None:
+        pytest.skip("numpy is not installed")
+
+    category = f"cat-{uuid.uuid4().hex}"
+    for rate, price, brand in [(4.0, 20.0, "Acme"), (None, 5.0, "Acme"), (4.0, 10.0, None), (5.0, 30.0, "Globex")]:
+        rating = {"rate": rate, "count": 1} if rate is not None else None
+        make_product(client, category=category, rating=rating, price=price, brand=brand, stockQuantity=2)
+
+    def read_all():
+        sorted_ids = [item["id"] for item in collect_pages(client, f"{PREFIX}/sorted", sort="-rating_rate,price", page_size=3)]
+        query = client.get(f"{PREFIX}/query", params={"category": category, "price_min": 8, "facets": True}).json()
+        return sorted_ids, [item["id"] for item in query["data"]], query["facets"]
+
+    monkeypatch.setattr(product_snapshot, "enabled", True)
+    monkeypatch.setattr(product_snapshot, "snapshot", None)
+    from_snapshot = read_all()
+    loads = product_snapshot.loads
+
+    # Writes through the API are applied to the snapshot without a reload
+    moved = make_product(client, category=category, price=12.0, brand="Initech")["id"]
+    assert client.patch(f"{PREFIX}/{moved}", json={"price": 50.0}).status_code == 200
+    updated = read_all()
+    assert product_snapshot.loads == loads
+
+    monkeypatch.setattr(product_snapshot, "enabled", False)
+    assert read_all() == updated
+    assert updated[1][-1] == moved and updated[0] != from_snapshot[0]
+
+
+def test_stats_aggregate_histograms_and_percentiles(client, monkeypatch):
+    from app.api.products.snapshot import np, product_snapshot
+    category = f"cat-{uuid.uuid4().hex}"
+    for price, brand, rate in [(5.0, "Acme", 4.0), (15.0, "Acme", 2.0), (40.0, "Globex", None), (60.0, None, 5.0)]:
+        rating = {"rate": rate, "count": 1} if rate is not None else None
+        make_product(client, category=category, price=price, brand=brand, rating=rating)
+
+    params = {
+        "category": category, "group_by": "brand",
+        "histogram": "price:10,50", "percentiles": "price:0,50,100",
+    }
+    body = client.get(f"{PREFIX}/stats", params=params).json()["data"]
+    assert body["count"] == 4
+    assert body["averages"]["price"] == 30.0
+    assert body["averages"]["rating_rate"] == pytest.approx(11 / 3)
+    assert [(group["key"]["brand"], group["count"]) for group in body["groups"]] == [(None, 1), ("Acme", 2), ("Globex", 1)]
+    assert [bucket["count"] for bucket in body["histograms"]["price"]] == [1, 2, 1]
+    assert body["percentiles"]["price"] == {"p0": 5.0, "p50": 15.0, "p100": 60.0}
+
+    # Cached per query shape until a write
+    assert client.get(f"{PREFIX}/stats", params=params).json()["data"] == body
+    make_product(client, category=category, price=100.0, brand="Acme")
+    assert client.get(f"{PREFIX}/stats", params=params).json()["data"]["count"] == 5
+
+    if np is not None:
+        monkeypatch.setattr(product_snapshot, "enabled", True)
+        from_snapshot = client.get(f"{PREFIX}/stats", params=dict(params, price_min=1)).json()["data"]
+        monkeypatch.setattr(product_snapshot, "enabled", False)
+        from app.api.products.cache import product_cache
+        product_cache.invalidate_prefix(("stats",))
+        assert client.get(f"{PREFIX}/stats", params=dict(params, price_min=1)).json()["data"] == from_snapshot
+
+    assert client.get(f"{PREFIX}/stats", params={"group_by": "title"}).status_code == 400
+    assert client.get(f"{PREFIX}/stats", params={"histogram": "price:50,10"}).status_code == 400
+
+
+def test_changes_feed_returns_writes_and_tombstones_since_a_seq(client):
+    head = client.get(f"{PREFIX}/changes", params={"since": 2 ** 62}).json()
+    assert head["data"] == [] and head["has_more"] is False
+
+    existing = collect_changes(client, 0, page_size=500)
+    since = existing[-1]["seq"] if existing else 0
+    kept = make_product(client, title="Kept")["id"]
+    removed = make_product(client, title="Removed")["id"]
+    assert client.patch(f"{PREFIX}/{kept}", json={"price": 99.0}).status_code == 200
+    assert client.patch(f"{PREFIX}/{kept}", json={"price": 98.0}).status_code == 200
+    assert client.delete(f"{PREFIX}/delete/{removed}").status_code == 200
+
+    changes = collect_changes(client, since, page_size=1)
+    # One entry per product at its latest change, in seq order
+    assert [(change["id"], change["deleted"]) for change in changes] == [(kept, False), (removed, True)]
+    assert changes[0]["product"]["price"] == 98.0
+    assert changes[1]["product"] is None
+    assert changes[0]["seq"] < changes[1]["seq"]
+
+
+def collect_changes(client, since, **params):
+    changes = []
+    while True:
+        body = client.get(f"{PREFIX}/changes", params=dict(params, since=since)).json()
+        changes.extend(body["data"])
+        since = body["next_since"]
+        if not body["has_more"]:
+            return changes
+